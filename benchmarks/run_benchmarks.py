@@ -0,0 +1,268 @@
+"""
+Benchmarks of ParallelKDEpy: Julia startup, grids, estimation and transfer costs.
+
+Results are written as JSON so that runs, e.g., of two releases, can be compared:
+
+    python benchmarks/run_benchmarks.py --output before.json
+    python benchmarks/run_benchmarks.py --preset full --threads 8 --output after.json
+    python benchmarks/run_benchmarks.py --compare before.json after.json
+
+The 'quick' preset takes a few minutes. The 'full' preset sweeps up to 10^8 samples,
+which needs several GB of memory in 3D; use --max-samples to cap it.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+import parallelkdepy as pkde
+
+PRESETS = {
+    "quick": dict(
+        n_samples=(10**3, 10**4, 10**5),
+        grid_sizes={1: (256,), 2: (64,), 3: (32,)},
+        repeat=3,
+    ),
+    "full": dict(
+        n_samples=(10**3, 10**4, 10**5, 10**6, 10**7, 10**8),
+        grid_sizes={1: (256, 4096), 2: (64, 256), 3: (32, 64)},
+        repeat=5,
+    ),
+}
+
+STARTUP_CODE = """
+import json, time
+t0 = time.perf_counter()
+import parallelkdepy as pkde
+t1 = time.perf_counter()
+pkde.Grid([(0.0, 1.0, 8)])
+t2 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "julia_startup": t2 - t1}))
+"""
+
+
+def timeit(fn, repeat: int, setup=None) -> dict:
+    """
+    Time `fn` `repeat` times after an untimed call to `setup`, if any, before each call.
+
+    The first call is reported separately, as it includes compilation in Julia.
+    """
+    times = []
+    for _ in range(repeat + 1):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    return dict(
+        first=times[0],
+        best=min(times[1:]),
+        median=statistics.median(times[1:]),
+        repeat=repeat,
+    )
+
+
+def bench_startup(repeat: int) -> list[dict]:
+    """
+    Import and Julia startup times, measured in fresh interpreters.
+    """
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_CODE],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    return [
+        dict(
+            name=name,
+            params={},
+            first=runs[0][name],
+            best=min(run[name] for run in runs),
+            median=statistics.median(run[name] for run in runs),
+            repeat=repeat,
+        )
+        for name in ("import", "julia_startup")
+    ]
+
+
+def bench_grid(n_dims: int, grid_size: int, repeat: int) -> list[dict]:
+    """
+    Grid creation without the grid cache, and transfer of its coordinates.
+    """
+    ranges = [(-5.0, 5.0, grid_size)] * n_dims
+    params = dict(n_dims=n_dims, grid_size=grid_size)
+    grid = pkde.Grid(ranges)
+
+    return [
+        dict(
+            name="grid_creation",
+            params=params,
+            **timeit(lambda: pkde.Grid(ranges), repeat, setup=pkde.clear_grid_cache),
+        ),
+        dict(
+            name="to_meshgrid",
+            params=params,
+            **timeit(lambda: grid.to_meshgrid(copy=True), repeat),
+        ),
+    ]
+
+
+def bench_data(
+    data: np.ndarray, grid_size: int, estimators: list[str], repeat: int
+) -> list[dict]:
+    """
+    Benchmarks that depend on the data: grid search, construction, binning, estimation
+    and transfer of the density.
+    """
+    n_samples, n_dims = data.shape
+    params = dict(n_dims=n_dims, n_samples=n_samples, grid_size=grid_size)
+    grid = pkde.Grid([(-5.0, 5.0, grid_size)] * n_dims)
+    results = []
+
+    def find_grid():
+        pkde.core.find_grid(data, grid_dims=(grid_size,) * n_dims, cache=False)
+
+    def construct():
+        pkde.DensityEstimation(data, grid=grid)._estimation_jl()
+
+    results.append(dict(name="find_grid", params=params, **timeit(find_grid, repeat)))
+    results.append(
+        dict(name="construction", params=params, **timeit(construct, repeat))
+    )
+
+    for implementation in pkde.core.AvailableImplementations["cpu"]:
+        results.append(
+            dict(
+                name="initialize_dirac_sequence",
+                params=dict(params, implementation=implementation),
+                **timeit(
+                    lambda: pkde.initialize_dirac_sequence(
+                        data, grid, method=implementation, copy=True
+                    ),
+                    repeat,
+                ),
+            )
+        )
+
+    density_estimation = pkde.DensityEstimation(data, grid=grid)
+    for estimator in estimators:
+        results.append(
+            dict(
+                name="estimate_density",
+                params=dict(params, estimator=estimator),
+                **timeit(lambda: density_estimation.estimate_density(estimator), repeat),
+            )
+        )
+
+    estimation_jl = density_estimation._estimation_jl()
+    results.append(
+        dict(
+            name="get_density",
+            params=params,
+            **timeit(lambda: pkde.core.get_density(estimation_jl, copy=True), repeat),
+        )
+    )
+
+    return results
+
+
+def run(args: argparse.Namespace) -> dict:
+    preset = PRESETS[args.preset]
+    repeat = args.repeat or preset["repeat"]
+    if args.threads is not None:
+        pkde.configure(threads=args.threads)
+
+    results = bench_startup(repeat)
+    rng = np.random.default_rng(0)
+    for n_dims in args.dims:
+        for grid_size in preset["grid_sizes"][n_dims]:
+            results.extend(bench_grid(n_dims, grid_size, repeat))
+        for n_samples in preset["n_samples"]:
+            if (args.max_samples is not None) and (n_samples > args.max_samples):
+                continue
+            data = rng.standard_normal((n_samples, n_dims))
+            for grid_size in preset["grid_sizes"][n_dims]:
+                results.extend(bench_data(data, grid_size, args.estimators, repeat))
+                print(
+                    f"{n_dims}D, {n_samples} samples, grid {grid_size}: done",
+                    file=sys.stderr,
+                )
+
+    return dict(
+        timestamp=datetime.now(timezone.utc).isoformat(),
+        preset=args.preset,
+        parallelkdepy=pkde.__version__,
+        python=platform.python_version(),
+        numpy=np.__version__,
+        machine=platform.machine(),
+        runtime=pkde.runtime_info(),
+        results=results,
+    )
+
+
+def compare(before_path: str, after_path: str, threshold: float) -> int:
+    """
+    Print the ratio of median times of two runs, returning the number of regressions.
+    """
+
+    def index(path):
+        with open(path) as f:
+            results = json.load(f)["results"]
+        return {
+            (r["name"], tuple(sorted(r["params"].items()))): r["median"] for r in results
+        }
+
+    before, after = index(before_path), index(after_path)
+    regressions = 0
+    for key in sorted(before.keys() & after.keys(), key=str):
+        ratio = after[key] / before[key] if before[key] > 0 else float("inf")
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        params = ", ".join(f"{k}={v}" for k, v in key[1])
+        print(
+            f"{key[0]}({params}): {before[key]:.4g}s -> {after[key]:.4g}s ({ratio:.2f}x){flag}"
+        )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--dims", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--estimators", nargs="+", default=["gradepro", "rot"])
+    parser.add_argument("--max-samples", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--output", default="benchmarks.json")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("BEFORE", "AFTER"), default=None
+    )
+    parser.add_argument("--threshold", type=float, default=1.1)
+    args = parser.parse_args()
+
+    if args.compare is not None:
+        sys.exit(1 if compare(*args.compare, threshold=args.threshold) else 0)
+
+    report = run(args)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
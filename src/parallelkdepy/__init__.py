@@ -3,7 +3,21 @@ ParallelKDEpy: Python wrapper for ParallelKDE.jl
 """
 
 from importlib.metadata import version as _pkg_version, PackageNotFoundError
-from .wrapper import DensityEstimation, Grid, initialize_dirac_sequence
+from .core import (
+    clear_grid_cache,
+    configure,
+    grid_cache_info,
+    profile,
+    runtime_info,
+)
+from .model import DensityModel, MultiResolutionDensity
+from .wrapper import (
+    DensityEstimation,
+    Grid,
+    estimate_many,
+    initialize_dirac_sequence,
+    warmup,
+)
 
 try:
     # Prefer installed dist metadata
@@ -17,4 +31,18 @@ except PackageNotFoundError:
 
 del _pkg_version, PackageNotFoundError
 
-__all__ = ["__version__", "DensityEstimation", "Grid", "initialize_dirac_sequence"]
+__all__ = [
+    "__version__",
+    "clear_grid_cache",
+    "configure",
+    "grid_cache_info",
+    "profile",
+    "runtime_info",
+    "DensityEstimation",
+    "DensityModel",
+    "Grid",
+    "MultiResolutionDensity",
+    "estimate_many",
+    "initialize_dirac_sequence",
+    "warmup",
+]
@@ -2,25 +2,448 @@
 Low-level plumbing: Manage Julia session and interfacing between Python and Julia.
 """
 
-from typing import Sequence, Optional
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Sequence, Optional
 
 import numpy as np
 
-from juliacall import Main as jl
+from . import interpolation
 
 _initialized = False
+_julia_main = None
+_init_lock = threading.Lock()
+_executor = None
+_config = {"threads": None, "blas_threads": None, "implementation": None}
+
+# Julia-side helpers used by this module. They only rely on Base and the public API of
+# ParallelKDE.jl.
+_JULIA_HELPERS = """
+module ParallelKDEpy
+
+using ParallelKDE
+using PythonCall: GIL
+using LinearAlgebra: BLAS
+using Random: Xoshiro
+
+# Python buffers backing arrays created by `wrap`, kept alive as long as the array is.
+# They are keyed by a counter rather than by the array, as arrays hash by content.
+const _owners = Dict{Int,Any}()
+const _owners_lock = ReentrantLock()
+const _owners_count = Threads.Atomic{Int}(0)
+
+function release_owner(array, id::Int)
+    # Finalizers must not wait for a lock, so the release is retried at a later GC
+    if islocked(_owners_lock) || !trylock(_owners_lock)
+        finalizer(a -> release_owner(a, id), array)
+        return nothing
+    end
+    try
+        delete!(_owners, id)
+    finally
+        unlock(_owners_lock)
+    end
+
+    return nothing
+end
+
+function wrap(ptr::Integer, ::Type{T}, dims::Tuple, owner) where {T}
+    array = unsafe_wrap(Array, Ptr{T}(UInt(ptr)), Int.(dims))
+    id = Threads.atomic_add!(_owners_count, 1)
+    lock(_owners_lock) do
+        _owners[id] = owner
+    end
+    finalizer(a -> release_owner(a, id), array)
+
+    return array
+end
+
+any_vector() = Any[]
+
+blas_threads() = BLAS.get_num_threads()
+set_blas_threads!(n::Integer) = BLAS.set_num_threads(n)
+
+# The estimation does not touch Python objects, so other Python threads can run meanwhile.
+function estimate_density_nogil!(density_estimation, estimation::Symbol; kwargs...)
+    GIL.@unlock estimate_density!(density_estimation, estimation; kwargs...)
+
+    return nothing
+end
+
+function estimate_many(datasets::AbstractVector, grid, device::Symbol, estimation::Symbol; kwargs...)
+    densities = Vector{Any}(undef, length(datasets))
+    Threads.@threads for i in eachindex(datasets)
+        density_estimation = initialize_estimation(datasets[i]; grid=grid, device=device)
+        estimate_density!(density_estimation, estimation; kwargs...)
+        densities[i] = get_density(density_estimation)
+    end
+
+    stacked = similar(first(densities), size(first(densities))..., length(densities))
+    for (i, density) in enumerate(densities)
+        selectdim(stacked, ndims(stacked), i) .= density
+    end
+
+    return stacked
+end
+
+estimate_many_nogil(args...; kwargs...) = GIL.@unlock estimate_many(args...; kwargs...)
+
+# Resample the samples (last dimension) of `data` with multinomial counts. The estimators
+# take no weights, so the replicate is expanded into a copy of the size of `data`.
+function resample(data::AbstractArray, seed::Integer)
+    rng = Xoshiro(seed)
+    n_samples = size(data, ndims(data))
+    counts = zeros(Int, n_samples)
+    for _ in 1:n_samples
+        counts[rand(rng, 1:n_samples)] += 1
+    end
+
+    resampled = similar(data)
+    j = 0
+    for i in 1:n_samples, _ in 1:counts[i]
+        j += 1
+        selectdim(resampled, ndims(data), j) .= selectdim(data, ndims(data), i)
+    end
+
+    return resampled
+end
+
+function bootstrap_many(data, grid, device::Symbol, estimation::Symbol, seeds::AbstractVector; kwargs...)
+    datasets = Vector{Any}(undef, length(seeds))
+    Threads.@threads for b in eachindex(seeds)
+        datasets[b] = resample(data, seeds[b])
+    end
+
+    return estimate_many(datasets, grid, device, estimation; kwargs...)
+end
+
+bootstrap_many_nogil(args...; kwargs...) = GIL.@unlock bootstrap_many(args...; kwargs...)
+
+# Integrate `density` over the dimensions not in `keep` with the rectangle rule.
+function marginal(density::AbstractArray, steps, keep::AbstractVector{<:Integer})
+    others = Tuple(d for d in 1:ndims(density) if !(d in keep))
+    volume = prod((steps[d] for d in others); init=one(eltype(density)))
+
+    return dropdims(sum(density; dims=others); dims=others) .* volume
+end
+
+# Interpolate `density` linearly at the fractional 0-based `positions` along `fixed`,
+# returning the slice over the other dimensions and its integral.
+function conditional(density::AbstractArray, steps, fixed::AbstractVector{<:Integer}, positions::AbstractVector)
+    T = eltype(density)
+    result = nothing
+    for corner in Iterators.product(ntuple(_ -> (0, 1), length(fixed))...)
+        index = Any[Colon() for _ in 1:ndims(density)]
+        weight = one(T)
+        for (k, d) in enumerate(fixed)
+            lower = min(floor(Int, positions[k]), size(density, d) - 2)
+            fraction = T(positions[k] - lower)
+            index[d] = lower + corner[k] + 1
+            weight *= corner[k] == 1 ? fraction : one(T) - fraction
+        end
+        iszero(weight) && continue
+        term = weight .* view(density, index...)
+        result = result === nothing ? term : result .+ term
+    end
+    others = [d for d in 1:ndims(density) if !(d in fixed)]
+    mass = sum(result) * prod((steps[d] for d in others); init=one(T))
+
+    return (result, mass)
+end
+
+# Whether a field of `x` is an array over the memory at `ptr`, i.e. `x` reads it in place.
+function holds_memory(x, ptr::Integer)
+    return any(fieldnames(typeof(x))) do name
+        isdefined(x, name) || return false
+        value = getfield(x, name)
+        return value isa Array && UInt(pointer(value)) == UInt(ptr)
+    end
+end
+
+# Call `f`, returning its value with the elapsed time, GC time and bytes allocated.
+function timed(f, args...; kwargs...)
+    stats = @timed f(args...; kwargs...)
+
+    return (stats.value, stats.time, stats.gctime, stats.bytes)
+end
+
+end
+"""
 
 
 def _init_julia():
-    global _initialized
+    """
+    Start the Julia runtime and load ParallelKDE.jl, if not done yet.
+
+    Returns
+    -------
+    juliacall.ModuleValue
+        The Julia `Main` module.
+    """
+    global _initialized, _julia_main
 
     if not _initialized:
-        jl.seval("using ParallelKDE")
-        _initialized = True
+        with _init_lock:
+            if not _initialized:
+                # Required by juliacall to run Julia while other Python threads hold the GIL
+                os.environ.setdefault("PYTHON_JULIACALL_HANDLE_SIGNALS", "yes")
+                if _config["threads"] is not None:
+                    os.environ["PYTHON_JULIACALL_THREADS"] = str(_config["threads"])
+
+                from juliacall import Main
+
+                Main.seval("using ParallelKDE")
+                Main.seval(_JULIA_HELPERS)
+                if _config["blas_threads"] is not None:
+                    Main.ParallelKDEpy.set_blas_threads_b(_config["blas_threads"])
+                _julia_main = Main
+                _initialized = True
+
+    return _julia_main
+
+
+def is_initialized() -> bool:
+    """
+    Whether the Julia runtime has already been started.
+    """
+    return _initialized
+
+
+def configure(
+    threads: Optional[int | str] = None,
+    blas_threads: Optional[int] = None,
+    implementation: Optional[str] = None,
+) -> dict:
+    """
+    Configure the execution of the Julia runtime.
+
+    Parameters
+    ----------
+    threads : Optional[int | str], optional
+        Number of Julia threads, or 'auto'. It can only be set before the runtime starts.
+    blas_threads : Optional[int], optional
+        Number of BLAS threads.
+    implementation : Optional[str], optional
+        Default implementation, e.g., 'serial' or 'threaded', used where it is available
+        for the device and none is given explicitly.
+
+    Returns
+    -------
+    dict
+        The effective configuration, as returned by `runtime_info`.
+    """
+    if threads is not None:
+        # juliacall starts Julia as soon as it is imported, e.g., by the user
+        if _initialized or ("juliacall" in sys.modules):
+            if threads != runtime_info()["threads"]:
+                raise RuntimeError(
+                    "The number of Julia threads can only be set before the runtime starts."
+                )
+        else:
+            _config["threads"] = threads
+    if blas_threads is not None:
+        _config["blas_threads"] = blas_threads
+        if _initialized:
+            jl.ParallelKDEpy.set_blas_threads_b(blas_threads)
+    if implementation is not None:
+        available = {i for impls in AvailableImplementations.values() for i in impls}
+        if implementation not in available:
+            raise ValueError(
+                f"Unsupported implementation: {implementation}. Available implementations: {sorted(available)}"
+            )
+        _config["implementation"] = implementation
+
+    return runtime_info()
+
+
+def runtime_info() -> dict:
+    """
+    Effective thread counts and default implementation.
+
+    Thread counts are queried from Julia once the runtime has started. Before that, the
+    configured values are reported, with None meaning the Julia default.
+    """
+    info = dict(_config, initialized=_initialized)
+    if _initialized:
+        info["threads"] = jl.Threads.nthreads()
+        info["blas_threads"] = jl.ParallelKDEpy.blas_threads()
+
+    return info
+
+
+def resolve_implementation(
+    device: str, implementation: Optional[str] = None
+) -> Optional[str]:
+    """
+    Implementation to use on the device, falling back to the configured default.
+    """
+    if implementation is None:
+        implementation = _config["implementation"]
+        if implementation not in AvailableImplementations.get(device, []):
+            return None
+    elif implementation not in AvailableImplementations.get(device, []):
+        raise ValueError(
+            f"Unsupported implementation {implementation} for device {device}. Available implementations: {AvailableImplementations.get(device, [])}"
+        )
+
+    return implementation
+
+
+def submit(fn: Callable, *args, **kwargs) -> Future:
+    """
+    Queue a call into Julia to run on the worker thread shared by all submissions.
+
+    Calls are executed one after another, so concurrent submissions never run against the
+    Julia runtime at the same time.
+
+    Returns
+    -------
+    concurrent.futures.Future
+        Future with the result of the call.
+    """
+    global _executor
+
+    if _executor is None:
+        with _init_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="parallelkdepy-julia"
+                )
+
+    return _executor.submit(fn, *args, **kwargs)
+
+
+PhaseStats = namedtuple(
+    "PhaseStats", ["phase", "wall_time", "gc_time", "bytes_allocated", "bytes_copied"]
+)
+PhaseStats.__doc__ = """
+Cost of one phase: wall time and Julia GC time in seconds, bytes allocated by Julia, and
+bytes copied on the Python side, e.g., to convert data or to copy results.
+"""
+
+
+class Profile:
+    """
+    Phases recorded within a `profile` block, in the order they ran.
+    """
+
+    def __init__(self, callback: Optional[Callable[[PhaseStats], None]] = None) -> None:
+        self.phases: list[PhaseStats] = []
+        self._callback = callback
+
+    def _record(self, stats: PhaseStats) -> None:
+        self.phases.append(stats)
+        if self._callback is not None:
+            self._callback(stats)
+
+    def summary(self) -> dict[str, PhaseStats]:
+        """
+        Totals per phase.
+        """
+        totals = {}
+        for stats in self.phases:
+            total = totals.get(stats.phase)
+            if total is not None:
+                stats = PhaseStats(
+                    stats.phase, *(a + b for a, b in zip(total[1:], stats[1:]))
+                )
+            totals[stats.phase] = stats
+
+        return totals
+
+
+_profiles = []
+_profiles_lock = threading.Lock()
+
+
+@contextmanager
+def profile(callback: Optional[Callable[[PhaseStats], None]] = None):
+    """
+    Record the cost of each phase of the calls into Julia made within the block.
+
+    Julia calls are timed with `@timed`, which adds their GC time and allocations, and
+    conversions between NumPy and Julia report the bytes they copy. Outside of a
+    `profile` block, nothing is recorded.
+
+    Parameters
+    ----------
+    callback : Optional[Callable[[PhaseStats], None]], optional
+        Function called with each phase as it is recorded, e.g., to export it to a
+        metrics system, by default None.
+
+    Yields
+    ------
+    Profile
+        Object whose `phases` lists the recorded `PhaseStats`.
+    """
+    run = Profile(callback)
+    with _profiles_lock:
+        _profiles.append(run)
+    try:
+        yield run
+    finally:
+        with _profiles_lock:
+            _profiles.remove(run)
+
+
+def profiling() -> bool:
+    """
+    Whether a `profile` block is active.
+    """
+    return bool(_profiles)
+
+
+def _record(stats: PhaseStats) -> None:
+    with _profiles_lock:
+        active = list(_profiles)
+    for run in active:
+        run._record(stats)
+
+
+def _record_copy(phase: str, start: float, bytes_copied: int) -> None:
+    """
+    Record a phase run in Python that started at `start`, if profiling.
+    """
+    if _profiles:
+        _record(PhaseStats(phase, time.perf_counter() - start, 0.0, 0, bytes_copied))
+
+
+def timed_call(phase: str, fn, *args, **kwargs):
+    """
+    Call the Julia function `fn`, recording it as `phase` if profiling.
+    """
+    if not _profiles:
+        return fn(*args, **kwargs)
+
+    start = time.perf_counter()
+    value, _, gc_time, bytes_allocated = jl.ParallelKDEpy.timed(fn, *args, **kwargs)
+    _record(
+        PhaseStats(phase, time.perf_counter() - start, gc_time, bytes_allocated, 0)
+    )
+
+    return value
+
+
+class _LazyJulia:
+    """
+    Stand-in for `juliacall.Main` that starts Julia on first attribute access.
+    """
+
+    def __getattr__(self, name):
+        return getattr(_init_julia(), name)
+
+
+jl = _LazyJulia()
 
 
 AvailableDevices = ["cpu", "cuda"]
 AvailableImplementations = {"cpu": ["serial", "threaded"], "cuda": ["cuda"]}
+AvailableLayouts = ["samples", "features"]
 
 
 def str_to_symbol(s: str):
@@ -36,7 +459,279 @@ def device_to_str(device) -> str:
     return devices[device]
 
 
-def create_grid(ranges: Sequence, device: str = "cpu", b32: Optional[bool] = None):
+def julia_eltype(dtype: np.dtype):
+    eltypes = {
+        np.dtype(np.float32): jl.Float32,
+        np.dtype(np.float64): jl.Float64,
+        np.dtype(np.int32): jl.Int32,
+        np.dtype(np.int64): jl.Int64,
+    }
+    try:
+        return eltypes[np.dtype(dtype)]
+    except KeyError:
+        raise ValueError(f"Unsupported data type for Julia arrays: {dtype}")
+
+
+def data_dtype(data: np.ndarray) -> np.dtype:
+    """
+    Precision in which data is handed to Julia by default: 32- and 64-bit floating point
+    data keeps its precision, and anything else is converted to 64-bit floating point.
+    """
+    dtype = np.asarray(data).dtype
+
+    return dtype if dtype in (np.float32, np.float64) else np.dtype(np.float64)
+
+
+def prepare_data(
+    data: np.ndarray, layout: str = "samples", dtype=None
+) -> tuple[np.ndarray, bool]:
+    """
+    Bring data into the memory layout that ParallelKDE.jl expects.
+
+    Julia arrays are column-major, so samples must be stored as the columns of a
+    Fortran-ordered `(n_features, n_samples)` array. A C-ordered `(n_samples, n_features)`
+    array already has this layout once transposed, and is used without copying, as is a
+    Fortran-ordered `(n_features, n_samples)` array. Any other input is converted once.
+
+    Parameters
+    ----------
+    data : np.ndarray
+        Data with shape (n_samples, n_features), (n_features, n_samples) or (n_samples,).
+    layout : str, optional
+        'samples' if rows of `data` are samples, or 'features' if its rows are features.
+        Default is 'samples'.
+    dtype : optional
+        Data type of the prepared array. Default is None, which keeps 32- and 64-bit floating
+        point data and converts anything else to 64-bit floating point.
+
+    Returns
+    -------
+    tuple[np.ndarray, bool]
+        The prepared array and whether a copy of `data` was made.
+    """
+    if layout not in AvailableLayouts:
+        raise ValueError(
+            f"Unsupported data layout: {layout}. Available layouts: {AvailableLayouts}"
+        )
+
+    array = np.asarray(data)
+    if (array.ndim > 1) and (layout == "samples"):
+        array = array.transpose()
+    if dtype is None:
+        dtype = data_dtype(array)
+
+    prepared = np.asarray(array, dtype=dtype, order="F")
+    copied = not (
+        isinstance(data, np.ndarray) and np.may_share_memory(prepared, data)
+    )
+
+    return prepared, copied
+
+
+def to_julia_array(array: np.ndarray):
+    """
+    Share the buffer of a Fortran-contiguous numpy array with Julia as a dense `Array`.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        Fortran-contiguous numpy array. It is kept alive as long as the Julia array is.
+
+    Returns
+    -------
+    juliacall.ArrayValue
+        Julia array over the same memory as `array`.
+    """
+    if not array.flags.f_contiguous:
+        raise ValueError("Only Fortran-contiguous arrays can be shared with Julia.")
+
+    return jl.ParallelKDEpy.wrap(
+        array.ctypes.data, julia_eltype(array.dtype), array.shape, array
+    )
+
+
+def load_data(data: np.ndarray | str | os.PathLike) -> np.ndarray:
+    """
+    Memory map data stored in a `.npy` file, or return arrays unchanged.
+
+    The memory map is read-only, and its pages are only read from disk when accessed.
+    """
+    if isinstance(data, (str, os.PathLike)):
+        return np.load(data, mmap_mode="r")
+
+    return data
+
+
+def open_output(
+    out: Optional[np.ndarray | str | os.PathLike], shape: tuple, dtype
+) -> Optional[np.ndarray]:
+    """
+    Output array for a result, creating a memory-mapped `.npy` file if `out` is a path.
+    """
+    if isinstance(out, (str, os.PathLike)):
+        return np.lib.format.open_memmap(out, mode="w+", dtype=dtype, shape=shape)
+
+    return out
+
+
+def to_numpy(array_jl, *, copy: bool = False, out: Optional[np.ndarray] = None):
+    """
+    Expose a Julia array as a numpy array.
+
+    Parameters
+    ----------
+    array_jl : juliacall.ArrayValue
+        Julia array. Arrays that do not live in host memory are first moved to a Julia
+        `Array`.
+    copy : bool, optional
+        Whether to return an array owned by Python. Default is False, which returns a
+        read-only view over the Julia memory that keeps the Julia array alive.
+    out : Optional[np.ndarray], optional
+        Array in which to write the result. Default is None.
+
+    Returns
+    -------
+    np.ndarray
+        `out` if given, otherwise a view or a copy of the Julia array.
+    """
+    start = time.perf_counter()
+    moved = not jl.isa(array_jl, jl.Array)
+    if moved:
+        array_jl = jl.Array(array_jl)
+
+    array_np = array_jl.to_numpy(copy=False)
+    array_np.flags.writeable = False
+
+    if out is not None:
+        np.copyto(out, array_np)
+        array_np = out
+    elif copy:
+        array_np = np.array(array_np, order="K")
+    _record_copy(
+        "to_numpy",
+        start,
+        array_np.nbytes * (int(moved) + int(copy or (out is not None))),
+    )
+
+    return array_np
+
+
+def copy_array(array: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Copy a numpy array, or write it into `out`, recording the copy as part of 'to_numpy'.
+    """
+    start = time.perf_counter()
+    if out is not None:
+        np.copyto(out, array)
+    else:
+        out = np.array(array, order="K")
+    _record_copy("to_numpy", start, array.nbytes)
+
+    return out
+
+
+def prepare_weights(weights, n_samples: int) -> np.ndarray:
+    """
+    Validate sample weights, returning them as a float64 array of shape (n_samples,).
+    """
+    weights = np.ascontiguousarray(weights, dtype=np.float64)
+    if weights.shape != (n_samples,):
+        raise ValueError(f"Weights must have shape ({n_samples},).")
+    if not np.all(np.isfinite(weights)) or np.any(weights < 0):
+        raise ValueError("Weights must be finite and non-negative.")
+    if n_samples and (weights.sum() <= 0):
+        raise ValueError("At least one weight must be positive.")
+
+    return weights
+
+
+def data_to_julia(data: np.ndarray, layout: str = "samples", dtype=None):
+    start = time.perf_counter()
+    prepared, copied = prepare_data(data, layout=layout, dtype=dtype)
+    array_jl = to_julia_array(prepared)
+    _record_copy("to_julia", start, prepared.nbytes if copied else 0)
+
+    return array_jl
+
+
+GridCacheInfo = namedtuple("GridCacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class GridCache:
+    """
+    Bounded LRU cache of Julia grid objects, so that identical grids are shared.
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._grids = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, create: Callable):
+        with self._lock:
+            if key in self._grids:
+                self.hits += 1
+                self._grids.move_to_end(key)
+                return self._grids[key]
+            self.misses += 1
+
+        grid = create()
+        with self._lock:
+            self._grids[key] = grid
+            while len(self._grids) > self.maxsize:
+                self._grids.popitem(last=False)
+
+        return grid
+
+    def info(self) -> GridCacheInfo:
+        return GridCacheInfo(self.hits, self.misses, self.maxsize, len(self._grids))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._grids.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_grid_cache = GridCache()
+
+
+def grid_cache_info() -> GridCacheInfo:
+    """
+    Hit and miss counts, maximum size and current size of the grid cache.
+    """
+    return _grid_cache.info()
+
+
+def clear_grid_cache(maxsize: Optional[int] = None) -> None:
+    """
+    Empty the grid cache and reset its statistics, optionally changing its maximum size.
+    """
+    _grid_cache.clear()
+    if maxsize is not None:
+        _grid_cache.maxsize = maxsize
+
+
+def _freeze(value):
+    """
+    Hashable version of nested sequences of numbers, to be used in cache keys.
+    """
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, np.generic):
+        return value.item()
+
+    return value
+
+
+def create_grid(
+    ranges: Sequence,
+    device: str = "cpu",
+    b32: Optional[bool] = None,
+    cache: bool = True,
+):
     """
     Create a grid instance of the Julia object `ParallelKDE.Grid`.
 
@@ -47,29 +742,47 @@ def create_grid(ranges: Sequence, device: str = "cpu", b32: Optional[bool] = Non
     device : str, optional
         The device type, e.g., 'cpu' or 'cuda'. Default is 'cpu'.
     b32 : Optional[bool], optional
-        Whether to use 32-bit precision for GPU devices.
-        Default is None, which behaves as True (32-bit precision) if the device is 'cuda'.
-        Setting it as False for 'cuda' devices will use 64-bit precision. This keyword
-        argument is ignored when device is 'cpu'.
+        Whether to use 32-bit precision. Default is None, which behaves as True (32-bit
+        precision) if the device is 'cuda' and as False (64-bit precision) if it is 'cpu'.
+        On CPU, 32-bit grids are built from single precision ranges.
+    cache : bool, optional
+        Whether to share the grid with identical grids through the grid cache. Default
+        is True.
 
     Returns
     -------
     juliacall.AnyValue
         The created grid object in Julia.
     """
-    ranges = [jl.range(start, stop, length) for start, stop, length in ranges]
     if device not in AvailableDevices:
         raise ValueError(
             f"Unsupported device type: {device}. Available devices: {AvailableDevices}"
         )
     b32 = b32 if b32 is not None else (device != "cpu")
 
-    if device == "cpu":
-        grid = jl.initialize_grid(*ranges, b32=b32)
-    else:
-        grid = jl.initialize_grid(*ranges, device=str_to_symbol(device), b32=b32)
+    def create():
+        if b32 and (device == "cpu"):
+            ranges_jl = [
+                jl.range(jl.Float32(start), jl.Float32(stop), length)
+                for start, stop, length in ranges
+            ]
+        else:
+            ranges_jl = [jl.range(start, stop, length) for start, stop, length in ranges]
+        if device == "cpu":
+            return timed_call("create_grid", jl.initialize_grid, *ranges_jl, b32=b32)
+        else:
+            return timed_call(
+                "create_grid",
+                jl.initialize_grid,
+                *ranges_jl,
+                device=str_to_symbol(device),
+                b32=b32,
+            )
+
+    if not cache:
+        return create()
 
-    return grid
+    return _grid_cache.get(("ranges", _freeze(ranges), device, b32), create)
 
 
 def grid_shape(grid_jl) -> tuple:
@@ -84,16 +797,21 @@ def grid_device(grid_jl) -> str:
         raise ValueError(f"Unsupported device type: {device_jl}")
 
 
-def grid_coordinates(grid_jl) -> tuple[np.ndarray, ...]:
-    coords_np = jl.get_coordinates(grid_jl).to_numpy()
+def grid_coordinates(grid_jl, copy: bool = False) -> tuple[np.ndarray, ...]:
+    coords_np = to_numpy(jl.get_coordinates(grid_jl))
+    coords = tuple(coords_np[i] for i in range(coords_np.shape[0]))
 
-    return tuple(np.ascontiguousarray(coords_np[i]) for i in range(coords_np.shape[0]))
+    return tuple(np.array(c) for c in coords) if copy else coords
 
 
 def grid_step(grid_jl) -> list:
     return list(jl.spacings(grid_jl).to_numpy())
 
 
+def grid_dtype(grid_jl) -> np.dtype:
+    return to_numpy(jl.spacings(grid_jl)).dtype
+
+
 def grid_bounds(grid_jl) -> list[tuple]:
     bounds_np = jl.bounds(grid_jl).to_numpy()
 
@@ -115,18 +833,45 @@ def find_grid(
     grid_steps: Optional[Sequence] = None,
     grid_padding: Optional[Sequence] = None,
     device: str = "cpu",
+    layout: str = "samples",
+    cache: bool = True,
+    dtype=None,
 ):
-    data = data.transpose() if data.ndim > 1 else data
-    device = str_to_symbol(device)
+    """
+    Find a grid suited to the data with `ParallelKDE.find_grid`.
 
-    return jl.find_grid(
-        data,
-        grid_bounds=grid_bounds,
-        grid_dims=grid_dims,
-        grid_steps=grid_steps,
-        grid_padding=grid_padding,
-        device=device,
+    When both `grid_bounds` and `grid_dims` are given, the grid does not depend on the
+    data and is shared through the grid cache, unless `cache` is False. The precision of
+    the grid follows that of the data, which is converted to `dtype` if given.
+    """
+    if dtype is None:
+        dtype = data_dtype(data)
+
+    def create():
+        return timed_call(
+            "find_grid",
+            jl.find_grid,
+            data_to_julia(data, layout=layout, dtype=dtype),
+            grid_bounds=grid_bounds,
+            grid_dims=grid_dims,
+            grid_steps=grid_steps,
+            grid_padding=grid_padding,
+            device=str_to_symbol(device),
+        )
+
+    if (not cache) or (grid_bounds is None) or (grid_dims is None):
+        return create()
+
+    key = (
+        "bounds",
+        _freeze(grid_bounds),
+        _freeze(grid_dims),
+        _freeze(grid_steps),
+        _freeze(grid_padding),
+        device,
+        np.dtype(dtype).name,
     )
+    return _grid_cache.get(key, create)
 
 
 def initialize_dirac_sequence(
@@ -135,6 +880,10 @@ def initialize_dirac_sequence(
     bootstrap_indices: Optional[np.ndarray] = None,
     device: str = "cpu",
     method: Optional[str] = None,
+    layout: str = "samples",
+    copy: bool = False,
+    out: Optional[np.ndarray] = None,
+    weights: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     """
     Creates a numpy array with the dirac sequence obtained from the data on the grid.
@@ -142,7 +891,8 @@ def initialize_dirac_sequence(
     Parameters
     ----------
     data : np.ndarray
-        Numpy array of the data with shape (n_samples, n_features).
+        Numpy array of the data with shape (n_samples, n_features), or
+        (n_features, n_samples) if `layout` is 'features'.
     grid_jl
         Julia grid object.
     bootstrap_indices : Optional[np.ndarray], optional
@@ -151,11 +901,59 @@ def initialize_dirac_sequence(
         The device to store the array, e.g., 'cpu' or 'cuda'. Default is 'cpu'.
     method : str, optional
         The method to use for initializing the Dirac sequence, e.g., 'serial' or 'parallel'. Default is 'serial'.
+    layout : str, optional
+        'samples' if rows of `data` are samples, or 'features' if its rows are features.
+        Default is 'samples'.
+    copy : bool, optional
+        Whether to return an array owned by Python instead of a read-only view over the
+        Julia result. Default is False.
+    out : Optional[np.ndarray], optional
+        Array of shape (n_bootstraps, *grid_shape) in which to write the result.
+    weights : Optional[np.ndarray], optional
+        Non-negative weights of the samples with shape (n_samples,). Weighted samples are
+        binned linearly in NumPy, chunk by chunk, into an array of the same shape and
+        complex precision as the unweighted sequence. They are only binned serially, and
+        cannot be combined with `bootstrap_indices`.
     """
     if data.ndim != 2:
         raise ValueError("Data must be 2-dimensional (n_samples, n_features).")
 
-    data = data.transpose() if data.ndim > 1 else data
+    if weights is not None:
+        if bootstrap_indices is not None:
+            raise ValueError("Weights cannot be combined with bootstrap indices.")
+        if device not in AvailableDevices:
+            raise ValueError(
+                f"Unsupported device type: {device}. Available devices: {AvailableDevices}"
+            )
+        if method not in (None, "serial"):
+            raise ValueError("Weighted samples can only be binned with the 'serial' method.")
+        samples = data.transpose() if layout == "features" else data
+        weights = prepare_weights(weights, samples.shape[0])
+        dirac_sequence = interpolation.bin_linear(
+            samples,
+            [bounds[0] for bounds in grid_bounds(grid_jl)],
+            grid_step(grid_jl),
+            grid_shape(grid_jl),
+            weights=weights,
+        )
+        # Same precision as the sequences binned in Julia, which are complex
+        dirac_sequence = dirac_sequence.astype(
+            np.result_type(grid_dtype(grid_jl), np.complex64)
+        )[np.newaxis]
+
+        if out is not None:
+            np.copyto(out, dirac_sequence)
+            return out
+        if not copy:
+            dirac_sequence.flags.writeable = False
+        return dirac_sequence
+
+    # Samples are binned in the precision of the grid
+    data = data_to_julia(
+        data,
+        layout=layout,
+        dtype=grid_dtype(grid_jl) if grid_jl is not None else None,
+    )
 
     if device not in AvailableDevices:
         raise ValueError(
@@ -163,26 +961,35 @@ def initialize_dirac_sequence(
         )
     if (method is not None) and (method not in AvailableImplementations[device]):
         raise ValueError("Unsupported method for the given device type.")
+    method = resolve_implementation(device, method)
     device = str_to_symbol(device)
     method = str_to_symbol(method) if method is not None else method
 
-    bootstrap_indices = (
-        bootstrap_indices.transpose()
-        if ((bootstrap_indices is not None) and (bootstrap_indices.ndim > 1))
-        else bootstrap_indices
-    )
+    if bootstrap_indices is not None:
+        bootstrap_indices, _ = prepare_data(
+            bootstrap_indices, dtype=np.asarray(bootstrap_indices).dtype
+        )
+        bootstrap_indices = to_julia_array(bootstrap_indices)
 
-    dirac_sequences = jl.initialize_dirac_sequence(
-        data,
-        grid=grid_jl,
-        bootstrap_idxs=bootstrap_indices,
-        device=device,
-        method=method,
-    ).to_numpy()
+    dirac_sequences = to_numpy(
+        timed_call(
+            "initialize_dirac_sequence",
+            jl.initialize_dirac_sequence,
+            data,
+            grid=grid_jl,
+            bootstrap_idxs=bootstrap_indices,
+            device=device,
+            method=method,
+        )
+    )
 
     dirac_sequences = np.moveaxis(dirac_sequences, -1, 0)
 
-    return np.ascontiguousarray(dirac_sequences)
+    if out is not None:
+        np.copyto(out, dirac_sequences)
+        return out
+
+    return np.array(dirac_sequences) if copy else dirac_sequences
 
 
 def create_density_estimation(
@@ -192,10 +999,24 @@ def create_density_estimation(
     grid_bounds: Optional[Sequence[tuple]] = None,
     grid_padding: Optional[Sequence] = None,
     device: str = "cpu",
+    layout: str = "samples",
+    dtype=None,
 ):
-    data = data.transpose() if data.ndim > 1 else data
+    """
+    Create the Julia object `ParallelKDE.DensityEstimation` for the data.
+
+    The data buffer is shared with Julia whenever `prepare_data` can do so without a
+    copy, so it must not be modified while the estimation object is in use. The data is
+    handed over as `dtype`, which defaults to the precision of `grid` if one is given.
+    """
+    if (dtype is None) and not isinstance(grid, bool) and (grid is not None):
+        dtype = grid_dtype(grid)
+
+    data = data_to_julia(data, layout=layout, dtype=dtype)
 
-    return jl.initialize_estimation(
+    return timed_call(
+        "initialize_estimation",
+        jl.initialize_estimation,
         data,
         grid=grid,
         dims=dims,
@@ -205,19 +1026,185 @@ def create_density_estimation(
     )
 
 
-def estimate_density(density_estimation, estimation_method: str, **kwargs):
+def holds_buffer(density_estimation, array: np.ndarray) -> bool:
+    """
+    Whether the Julia estimation object reads its data from the memory of `array`.
+    """
+    return bool(jl.ParallelKDEpy.holds_memory(density_estimation, array.ctypes.data))
+
+
+def estimate_density(
+    density_estimation,
+    estimation_method: str,
+    implementation: Optional[str] = None,
+    **kwargs,
+):
+    """
+    Run `ParallelKDE.estimate_density!` on the estimation object.
+
+    The GIL is released during the estimation, so other Python threads keep running.
+    `implementation` is passed to the estimator as its `method` keyword argument.
+    """
+    if implementation is not None:
+        kwargs.setdefault("method", implementation)
     kwargs = {
         k: str_to_symbol(v) if isinstance(v, str) else v for k, v in kwargs.items()
     }
-    jl.estimate_density_b(
-        density_estimation, str_to_symbol(estimation_method), **kwargs
+    timed_call(
+        "estimate_density",
+        jl.ParallelKDEpy.estimate_density_nogil_b,
+        density_estimation,
+        str_to_symbol(estimation_method),
+        **kwargs,
     )
 
     return None
 
 
-def get_density(density_estimation, **kwargs) -> np.ndarray:
+def estimate_many(
+    datasets: Sequence[np.ndarray],
+    grid_jl,
+    estimation_method: str,
+    device: str = "cpu",
+    layout: str = "samples",
+    implementation: Optional[str] = None,
+    **kwargs,
+) -> np.ndarray:
+    """
+    Estimate the density of several datasets on the same grid with a single Julia call.
+
+    The datasets are distributed over the Julia threads, and the GIL is released while
+    they are estimated.
+
+    Returns
+    -------
+    np.ndarray
+        Read-only view with shape (n_datasets, *grid_shape) over the stacked densities.
+    """
+    dtype = grid_dtype(grid_jl)
+    datasets_jl = jl.ParallelKDEpy.any_vector()
+    for data in datasets:
+        jl.push_b(datasets_jl, data_to_julia(data, layout=layout, dtype=dtype))
+
+    if implementation is not None:
+        kwargs.setdefault("method", implementation)
+    kwargs = {
+        k: str_to_symbol(v) if isinstance(v, str) else v for k, v in kwargs.items()
+    }
+    densities = timed_call(
+        "estimate_many",
+        jl.ParallelKDEpy.estimate_many_nogil,
+        datasets_jl,
+        grid_jl,
+        str_to_symbol(device),
+        str_to_symbol(estimation_method),
+        **kwargs,
+    )
+
+    return np.moveaxis(to_numpy(densities), -1, 0)
+
+
+def bootstrap_densities(
+    data: np.ndarray,
+    grid_jl,
+    estimation_method: str,
+    seeds: np.ndarray,
+    device: str = "cpu",
+    layout: str = "samples",
+    implementation: Optional[str] = None,
+    **kwargs,
+) -> np.ndarray:
+    """
+    Estimate the density of bootstrap replicates of the data, one per seed.
+
+    Each replicate is resampled in Julia from multinomial counts drawn with its seed, so
+    no index matrix is built, and the replicates are estimated in parallel over the Julia
+    threads with the GIL released.
+
+    Returns
+    -------
+    np.ndarray
+        Read-only view with shape (n_seeds, *grid_shape) over the densities.
+    """
+    seeds_jl = to_julia_array(np.asarray(seeds, dtype=np.int64))
+
+    if implementation is not None:
+        kwargs.setdefault("method", implementation)
+    kwargs = {
+        k: str_to_symbol(v) if isinstance(v, str) else v for k, v in kwargs.items()
+    }
+    densities = timed_call(
+        "bootstrap",
+        jl.ParallelKDEpy.bootstrap_many_nogil,
+        data_to_julia(data, layout=layout, dtype=grid_dtype(grid_jl)),
+        grid_jl,
+        str_to_symbol(device),
+        str_to_symbol(estimation_method),
+        seeds_jl,
+        **kwargs,
+    )
+
+    return np.moveaxis(to_numpy(densities), -1, 0)
+
+
+def marginal_density(
+    density_estimation, grid_jl, keep: Sequence[int], **kwargs
+) -> np.ndarray:
+    """
+    Marginal density over the dimensions in `keep`, in increasing order, integrated in
+    Julia so that only the reduced array is transferred.
+    """
+    density = jl.get_density(density_estimation, **kwargs)
+    keep_jl = to_julia_array(np.asarray(keep, dtype=np.int64) + 1)
+
+    return to_numpy(
+        timed_call(
+            "marginal", jl.ParallelKDEpy.marginal, density, jl.spacings(grid_jl), keep_jl
+        )
+    )
+
+
+def conditional_density(
+    density_estimation,
+    grid_jl,
+    fixed: Sequence[int],
+    positions: Sequence[float],
+    **kwargs,
+) -> np.ndarray:
+    """
+    Density of the other dimensions at the fractional grid indices `positions` along
+    `fixed`, normalized to integrate to one. It is computed in Julia, so that only the
+    reduced array is transferred.
+    """
     density = jl.get_density(density_estimation, **kwargs)
-    density_np = density.to_numpy()
+    fixed_jl = to_julia_array(np.asarray(fixed, dtype=np.int64) + 1)
+    positions_jl = to_julia_array(np.asarray(positions, dtype=np.float64))
+
+    conditional, mass = timed_call(
+        "conditional",
+        jl.ParallelKDEpy.conditional,
+        density,
+        jl.spacings(grid_jl),
+        fixed_jl,
+        positions_jl,
+    )
+    if not mass > 0:
+        raise ValueError("The density is zero at the conditioning values.")
+
+    conditional = np.array(to_numpy(conditional))
+    conditional /= mass
+    conditional.flags.writeable = False
+
+    return conditional
+
+
+def get_density(
+    density_estimation,
+    *,
+    copy: bool = False,
+    out: Optional[np.ndarray] = None,
+    **kwargs,
+) -> np.ndarray:
+    density = timed_call("get_density", jl.get_density, density_estimation, **kwargs)
 
-    return np.ascontiguousarray(density_np)
+    return to_numpy(density, copy=copy, out=out)
@@ -0,0 +1,135 @@
+"""
+Binning of large datasets split in shards across worker processes or machines.
+
+Each Python process runs its own Julia runtime, so binning scales across processes,
+including remote workers behind a `concurrent.futures.Executor` interface. Partial Dirac
+sequences are reduced by summation in the calling process.
+
+Only binning is distributed: the estimators of ParallelKDE.jl work on the samples
+themselves, so estimates are run by `DensityEstimation` in a single process.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from typing import Optional
+
+import numpy as np
+
+from . import core
+from .wrapper import Grid, initialize_dirac_sequence
+
+
+def _bin_shard(
+    shard: np.ndarray | tuple,
+    grid: Grid,
+    device: str,
+    method: Optional[str],
+    layout: str,
+) -> tuple[np.ndarray, int]:
+    """
+    Dirac sequence of a shard multiplied by its number of samples. Shards given as
+    `(path, start, stop)` are read through a memory map in the worker.
+    """
+    if isinstance(shard, tuple):
+        path, start, stop = shard
+        data = core.load_data(path)
+        shard = data[:, start:stop] if layout == "features" else data[start:stop]
+    n_samples = shard.shape[-1] if layout == "features" else shard.shape[0]
+
+    dirac_sequence = initialize_dirac_sequence(
+        shard, grid, device=device, method=method, layout=layout, copy=True
+    )[0]
+
+    return n_samples * dirac_sequence, n_samples
+
+
+def dirac_sequence(
+    data: np.ndarray | str | os.PathLike,
+    grid: Grid,
+    *,
+    n_shards: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    device: str = "cpu",
+    method: Optional[str] = None,
+    layout: str = "samples",
+) -> np.ndarray:
+    """
+    Dirac sequence of the data on the grid, binned in shards by worker processes.
+
+    Parameters
+    ----------
+    data : np.ndarray | str | os.PathLike
+        Data with shape (n_samples, n_features), or the path of a `.npy` file with it.
+        Paths are preferred for large data: workers then read their shard from a memory
+        map instead of receiving it through the executor.
+    grid : Grid
+        Grid shared by all shards. It is sent to the workers by its definition.
+    n_shards : Optional[int], optional
+        Number of shards, by default the number of CPUs.
+    executor : Optional[Executor], optional
+        Executor running the shards, e.g., one whose workers live on other machines. By
+        default, a pool of `n_shards` local processes is started for the call.
+    device : str, optional
+        Device on which the workers bin their shard, by default 'cpu'.
+    method : Optional[str], optional
+        Implementation used by the workers, e.g., 'serial' or 'threaded', by default None.
+    layout : str, optional
+        'samples' or 'features', as in `initialize_dirac_sequence`, by default 'samples'.
+
+    Returns
+    -------
+    np.ndarray
+        Dirac sequence of all samples, with the shape of the grid.
+    """
+    if layout not in core.AvailableLayouts:
+        raise ValueError(
+            f"Unsupported layout: {layout}. Available layouts: {core.AvailableLayouts}"
+        )
+    path = data if isinstance(data, (str, os.PathLike)) else None
+    data = core.load_data(data)
+    if data.ndim != 2:
+        raise ValueError("Data must be 2-dimensional.")
+    n_samples = data.shape[-1] if layout == "features" else data.shape[0]
+    if n_samples == 0:
+        raise ValueError("Data must contain at least one sample.")
+
+    n_shards = min(n_shards or os.cpu_count() or 1, n_samples)
+    bounds = np.linspace(0, n_samples, n_shards + 1, dtype=np.intp)
+    shards = []
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        if path is not None:
+            shards.append((os.fspath(path), int(start), int(stop)))
+        elif layout == "features":
+            shards.append(data[:, start:stop])
+        else:
+            shards.append(data[start:stop])
+
+    own_executor = executor is None
+    if own_executor:
+        # Julia does not survive being forked, so workers are started fresh
+        executor = ProcessPoolExecutor(
+            max_workers=n_shards, mp_context=multiprocessing.get_context("spawn")
+        )
+    try:
+        futures = [
+            executor.submit(_bin_shard, shard, grid, device, method, layout)
+            for shard in shards
+        ]
+        dirac_sum = None
+        total = 0
+        for future in as_completed(futures):
+            partial, n_partial = future.result()
+            if dirac_sum is None:
+                dirac_sum = partial
+            else:
+                dirac_sum += partial
+            total += n_partial
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    dirac_sum /= total
+
+    return dirac_sum
+
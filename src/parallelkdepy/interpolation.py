@@ -0,0 +1,266 @@
+"""
+Interpolation and binning of values on regular grids, implemented with NumPy only.
+"""
+
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Sequence, Optional
+
+import numpy as np
+
+AvailableInterpolations = ["linear", "cubic"]
+
+
+def _cubic_weights(t: np.ndarray) -> list[np.ndarray]:
+    """
+    Weights of the Keys cubic convolution kernel (a = -0.5) for the nodes at offsets
+    -1, 0, 1 and 2 from the lower node of each cell.
+    """
+    t2 = t * t
+    t3 = t2 * t
+
+    return [
+        -0.5 * t3 + t2 - 0.5 * t,
+        1.5 * t3 - 2.5 * t2 + 1.0,
+        -1.5 * t3 + 2.0 * t2 + 0.5 * t,
+        0.5 * t3 - 0.5 * t2,
+    ]
+
+
+def _interpolate_chunk(
+    values: np.ndarray,
+    positions: np.ndarray,
+    method: str,
+    fill_value: float,
+) -> np.ndarray:
+    """
+    Interpolate `values` at `positions`, given in fractional grid indices.
+    """
+    shape = np.array(values.shape)
+    n_dims = len(shape)
+
+    # Points on the boundary may fall slightly outside due to rounding
+    tolerance = 1e-9
+    inside = np.all(
+        (positions >= -tolerance) & (positions <= shape - 1 + tolerance), axis=1
+    )
+    positions = np.clip(positions, 0, shape - 1)
+    lower = np.clip(np.floor(positions).astype(np.intp), 0, np.maximum(shape - 2, 0))
+    fraction = positions - lower
+
+    if method == "linear":
+        offsets = (0, 1)
+        weights = [[1.0 - fraction[:, i], fraction[:, i]] for i in range(n_dims)]
+    else:
+        offsets = (-1, 0, 1, 2)
+        weights = [_cubic_weights(fraction[:, i]) for i in range(n_dims)]
+
+    result = np.zeros(positions.shape[0], dtype=np.result_type(values, np.float64))
+    for corner in itertools.product(range(len(offsets)), repeat=n_dims):
+        idx = tuple(
+            np.clip(lower[:, i] + offsets[c], 0, shape[i] - 1)
+            for i, c in enumerate(corner)
+        )
+        weight = weights[0][corner[0]]
+        for i in range(1, n_dims):
+            weight = weight * weights[i][corner[i]]
+        result += weight * values[idx]
+
+    if method == "cubic":
+        np.maximum(result, 0.0, out=result)
+    result[~inside] = fill_value
+
+    return result
+
+
+def interpolate(
+    values: np.ndarray,
+    lower_bounds: Sequence[float],
+    steps: Sequence[float],
+    points: np.ndarray,
+    *,
+    method: str = "linear",
+    fill_value: float = 0.0,
+    chunk_size: int = 2**16,
+    n_threads: Optional[int] = None,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Interpolate values given on a regular grid at arbitrary points.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Values on the grid nodes, with one axis per dimension.
+    lower_bounds : Sequence[float]
+        Coordinates of the first node in each dimension.
+    steps : Sequence[float]
+        Spacing between nodes in each dimension.
+    points : np.ndarray
+        Query points with shape (n_points, n_dims). For 1-dimensional grids, a shape of
+        (n_points,) is accepted as well.
+    method : str, optional
+        'linear' for multilinear interpolation or 'cubic' for cubic convolution, by
+        default 'linear'. Negative values produced by 'cubic' are clipped to zero.
+    fill_value : float, optional
+        Value for points outside of the grid, by default 0.0.
+    chunk_size : int, optional
+        Number of points processed at once, which bounds the temporary memory, by default
+        65536.
+    n_threads : Optional[int], optional
+        Number of threads across which chunks are distributed, by default None (one
+        thread).
+    out : Optional[np.ndarray], optional
+        Array of shape (n_points,) in which to write the result, by default None.
+
+    Returns
+    -------
+    np.ndarray
+        Interpolated values with shape (n_points,).
+    """
+    if method not in AvailableInterpolations:
+        raise ValueError(
+            f"Unsupported interpolation method: {method}. Available methods: {AvailableInterpolations}"
+        )
+
+    n_dims = values.ndim
+    points = np.asarray(points)
+    if (points.ndim == 1) and (n_dims == 1):
+        points = points[:, np.newaxis]
+    if (points.ndim != 2) or (points.shape[1] != n_dims):
+        raise ValueError(f"Points must have shape (n_points, {n_dims}).")
+
+    n_points = points.shape[0]
+    if out is None:
+        out = np.empty(n_points, dtype=np.result_type(values, np.float64))
+    elif out.shape != (n_points,):
+        raise ValueError(f"Output array must have shape ({n_points},).")
+
+    lower_bounds = np.asarray(lower_bounds, dtype=np.float64)
+    steps = np.asarray(steps, dtype=np.float64)
+
+    def process(start: int) -> None:
+        stop = min(start + chunk_size, n_points)
+        positions = (points[start:stop] - lower_bounds) / steps
+        out[start:stop] = _interpolate_chunk(values, positions, method, fill_value)
+
+    starts = range(0, n_points, chunk_size)
+    if (n_threads is None) or (n_threads <= 1):
+        for start in starts:
+            process(start)
+    else:
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            list(executor.map(process, starts))
+
+    return out
+
+
+def bin_linear(
+    points: np.ndarray,
+    lower_bounds: Sequence[float],
+    steps: Sequence[float],
+    shape: Sequence[int],
+    *,
+    weights: Optional[np.ndarray] = None,
+    normalize: bool = True,
+    chunk_size: int = 2**16,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Spread weighted points over the nodes of a regular grid by linear binning.
+
+    Each point contributes to the 2^d nodes around it with multilinear weights, divided by
+    the cell volume and by the total weight, so that the result integrates to the fraction
+    of weight that falls inside of the grid. Points outside of the grid are dropped.
+    Memory beyond the result is bounded by `chunk_size`.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        Points with shape (n_points, n_dims).
+    lower_bounds : Sequence[float]
+        Coordinates of the first node in each dimension.
+    steps : Sequence[float]
+        Spacing between nodes in each dimension.
+    shape : Sequence[int]
+        Number of nodes in each dimension.
+    weights : Optional[np.ndarray], optional
+        Non-negative weights with shape (n_points,), by default None (equal weights).
+    normalize : bool, optional
+        Whether to divide by the total weight, by default True. Unnormalized results of
+        several batches of points can be added up and divided by their total weight.
+    chunk_size : int, optional
+        Number of points processed at once, by default 65536.
+    out : Optional[np.ndarray], optional
+        C-contiguous array of the grid shape in which to write the result.
+
+    Returns
+    -------
+    np.ndarray
+        Binned values with the grid shape.
+    """
+    shape = tuple(int(n) for n in shape)
+    n_dims = len(shape)
+    points = np.asarray(points)
+    if (points.ndim != 2) or (points.shape[1] != n_dims):
+        raise ValueError(f"Points must have shape (n_points, {n_dims}).")
+    n_points = points.shape[0]
+
+    if weights is None:
+        total_weight = float(n_points)
+    else:
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.shape != (n_points,):
+            raise ValueError(f"Weights must have shape ({n_points},).")
+        total_weight = float(weights.sum())
+    if normalize and (total_weight <= 0):
+        raise ValueError("The total weight must be positive.")
+
+    if out is None:
+        out = np.zeros(shape)
+    elif (out.shape != shape) or (not out.flags.c_contiguous):
+        raise ValueError(f"Output array must be C-contiguous with shape {shape}.")
+    else:
+        out[...] = 0.0
+    flat = out.reshape(-1)
+
+    lower_bounds = np.asarray(lower_bounds, dtype=np.float64)
+    steps = np.asarray(steps, dtype=np.float64)
+    upper = np.array(shape) - 1
+    normalization = 1.0 / np.prod(steps)
+    if normalize:
+        normalization /= total_weight
+
+    for start in range(0, n_points, chunk_size):
+        stop = min(start + chunk_size, n_points)
+        positions = (points[start:stop] - lower_bounds) / steps
+        inside = np.all((positions >= -1e-9) & (positions <= upper + 1e-9), axis=1)
+        positions = np.clip(positions[inside], 0, upper)
+        if weights is None:
+            point_weights = np.full(positions.shape[0], normalization)
+        else:
+            point_weights = weights[start:stop][inside] * normalization
+
+        if positions.shape[0] == 0:
+            continue
+        lower = np.clip(np.floor(positions).astype(np.intp), 0, np.maximum(upper - 1, 0))
+        fraction = positions - lower
+        indices = []
+        values = []
+        for corner in itertools.product((0, 1), repeat=n_dims):
+            idx = tuple(
+                np.minimum(lower[:, i] + c, upper[i]) for i, c in enumerate(corner)
+            )
+            corner_weights = point_weights.copy()
+            for i, c in enumerate(corner):
+                corner_weights *= fraction[:, i] if c else 1.0 - fraction[:, i]
+            indices.append(np.ravel_multi_index(idx, shape))
+            values.append(corner_weights)
+
+        # Sums over the range of nodes touched by the chunk, much faster than np.add.at
+        indices = np.concatenate(indices)
+        first = indices.min()
+        sums = np.bincount(indices - first, weights=np.concatenate(values))
+        flat[first : first + sums.shape[0]] += sums
+
+    return out
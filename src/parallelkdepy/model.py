@@ -0,0 +1,417 @@
+"""
+Pure NumPy model of an estimated density, to serve precomputed estimates without Julia.
+"""
+
+import itertools
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Sequence
+
+import numpy as np
+
+from . import interpolation
+
+
+def _conditioning(
+    dims: int | Sequence[int],
+    at: float | Sequence[float],
+    bounds: Sequence[tuple],
+    steps: Sequence[float],
+) -> tuple[list[int], list[float]]:
+    """
+    Validate conditioning dimensions and values, returning the dimensions and the
+    fractional grid index of each value.
+    """
+    n_dims = len(bounds)
+    dims = [dims] if np.isscalar(dims) else list(dims)
+    dims = [int(d) % n_dims for d in dims]
+    at = np.atleast_1d(np.asarray(at, dtype=np.float64))
+    if (len(set(dims)) != len(dims)) or not (0 < len(dims) < n_dims):
+        raise ValueError("Conditioning dimensions must be unique and leave one free.")
+    if at.shape != (len(dims),):
+        raise ValueError("One conditioning value per dimension is required.")
+
+    positions = []
+    for d, value in zip(dims, at):
+        lb, ub = bounds[d]
+        if not (lb - 1e-9 * steps[d] <= value <= ub + 1e-9 * steps[d]):
+            raise ValueError(f"Value {value} is outside of the grid in dimension {d}.")
+        positions.append(float(np.clip((value - lb) / steps[d], 0.0, None)))
+
+    return dims, positions
+
+
+class DensityModel:
+    """
+    Density sampled on a regular grid, evaluated, marginalized and sampled with NumPy.
+
+    It is created from a fitted estimation with `DensityEstimation.to_model`, or loaded
+    from a file written by `DensityEstimation.save`. Neither this module nor the model
+    start Julia or import juliacall.
+
+    Parameters
+    ----------
+    axes : Sequence[np.ndarray]
+        Evenly spaced coordinates of the grid nodes along each dimension.
+    density : np.ndarray
+        Density at the grid nodes, with one axis per dimension.
+    """
+
+    def __init__(self, axes: Sequence[np.ndarray], density: np.ndarray) -> None:
+        # Single precision axes are accepted within their rounding error
+        eps = [
+            np.finfo(np.result_type(axis, np.float32)).eps
+            for axis in map(np.asarray, axes)
+        ]
+        axes = tuple(np.asarray(axis, dtype=np.float64) for axis in axes)
+        density = np.array(density)
+        if density.shape != tuple(axis.shape[0] for axis in axes):
+            raise ValueError("The shape of the density must match the grid axes.")
+
+        steps = []
+        for axis, axis_eps in zip(axes, eps):
+            if (axis.ndim != 1) or (axis.shape[0] < 2):
+                raise ValueError("Each axis must be 1-dimensional with at least 2 nodes.")
+            step = (axis[-1] - axis[0]) / (axis.shape[0] - 1)
+            atol = 4 * axis_eps * np.abs(axis).max()
+            if not np.allclose(np.diff(axis), step, rtol=1e-6, atol=atol):
+                raise ValueError("Axes must be evenly spaced.")
+            axis.flags.writeable = False
+            steps.append(float(step))
+
+        density.flags.writeable = False
+        self._axes = axes
+        self._density = density
+        self._steps = steps
+        self._cdf = None
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> "DensityModel":
+        """
+        Loads the density stored with `DensityEstimation.save`.
+        """
+        with np.load(path, allow_pickle=False) as stored:
+            grid = json.loads(str(stored["metadata"]))["grid"]
+            density = stored["density"]
+        axes = [
+            lb + step * np.arange(n)
+            for (lb, _), step, n in zip(grid["bounds"], grid["step"], grid["shape"])
+        ]
+
+        return cls(axes, density)
+
+    @property
+    def axes(self) -> tuple[np.ndarray, ...]:
+        """
+        Read-only coordinates of the grid nodes along each dimension.
+        """
+        return self._axes
+
+    @property
+    def density(self) -> np.ndarray:
+        """
+        Read-only density at the grid nodes.
+        """
+        return self._density
+
+    @property
+    def shape(self) -> tuple:
+        """
+        Shape of the grid.
+        """
+        return self._density.shape
+
+    @property
+    def ndim(self) -> int:
+        """
+        Number of dimensions of the density.
+        """
+        return self._density.ndim
+
+    def step(self) -> list:
+        """
+        List of step sizes for each dimension of the grid.
+        """
+        return list(self._steps)
+
+    def bounds(self) -> list[tuple]:
+        """
+        List of tuples of bounds for each dimension of the grid.
+        """
+        return [(float(axis[0]), float(axis[-1])) for axis in self._axes]
+
+    def evaluate(
+        self,
+        points: np.ndarray,
+        *,
+        method: str = "linear",
+        fill_value: float = 0.0,
+        chunk_size: int = 2**16,
+        n_threads: Optional[int] = None,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Evaluates the density at arbitrary points by interpolation on the grid.
+
+        The arguments are those of `DensityEstimation.evaluate`.
+
+        Returns
+        -------
+        np.ndarray
+            Density at each point, with shape (n_points,).
+        """
+        return interpolation.interpolate(
+            self._density,
+            [axis[0] for axis in self._axes],
+            self._steps,
+            points,
+            method=method,
+            fill_value=fill_value,
+            chunk_size=chunk_size,
+            n_threads=n_threads,
+            out=out,
+        )
+
+    def marginal(self, dims: int | Sequence[int]) -> "DensityModel":
+        """
+        Marginal density over the given dimensions.
+
+        The remaining dimensions are integrated out with the rectangle rule on the grid.
+
+        Parameters
+        ----------
+        dims : int | Sequence[int]
+            Dimension or dimensions to keep, in the order they should have.
+
+        Returns
+        -------
+        DensityModel
+            Model of the marginal density.
+        """
+        dims = [dims] if np.isscalar(dims) else list(dims)
+        dims = [int(d) % self.ndim for d in dims]
+        if (len(dims) == 0) or (len(set(dims)) != len(dims)):
+            raise ValueError("Dimensions to keep must be unique and non-empty.")
+
+        others = tuple(d for d in range(self.ndim) if d not in dims)
+        marginal = self._density.sum(axis=others) * np.prod(
+            [self._steps[d] for d in others]
+        )
+        kept = sorted(dims)
+        marginal = np.moveaxis(marginal, [kept.index(d) for d in dims], range(len(dims)))
+
+        return DensityModel([self._axes[d] for d in dims], marginal)
+
+    def conditional(
+        self, dims: int | Sequence[int], at: float | Sequence[float]
+    ) -> "DensityModel":
+        """
+        Density of the other dimensions conditioned on `dims` taking the values `at`.
+
+        The density is interpolated linearly at `at` along `dims` and normalized to
+        integrate to one over the remaining dimensions.
+
+        Parameters
+        ----------
+        dims : int | Sequence[int]
+            Dimension or dimensions on which to condition.
+        at : float | Sequence[float]
+            Value of each dimension in `dims`.
+
+        Returns
+        -------
+        DensityModel
+            Model of the conditional density over the remaining dimensions.
+        """
+        dims, positions = _conditioning(dims, at, self.bounds(), self._steps)
+        remaining = [d for d in range(self.ndim) if d not in dims]
+
+        conditional = 0.0
+        for corner in itertools.product((0, 1), repeat=len(dims)):
+            index = [slice(None)] * self.ndim
+            weight = 1.0
+            for d, position, c in zip(dims, positions, corner):
+                lower = min(int(np.floor(position)), self.shape[d] - 2)
+                fraction = position - lower
+                index[d] = lower + c
+                weight *= fraction if c else 1.0 - fraction
+            if weight != 0.0:
+                conditional = conditional + weight * self._density[tuple(index)]
+
+        mass = np.sum(conditional) * np.prod([self._steps[d] for d in remaining])
+        if not mass > 0:
+            raise ValueError("The density is zero at the conditioning values.")
+
+        return DensityModel([self._axes[d] for d in remaining], conditional / mass)
+
+    def sample(
+        self,
+        n_samples: int,
+        *,
+        seed: Optional[int | np.random.Generator] = None,
+        n_threads: Optional[int] = None,
+        chunk_size: int = 2**20,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Draws samples from the density.
+
+        Grid cells are drawn by inverse transform sampling on the cumulative distribution
+        of the density, which is computed once per model, and samples are placed
+        uniformly within their cell. Negative values of the density are treated as zero.
+
+        Parameters
+        ----------
+        n_samples : int
+            Number of samples.
+        seed : Optional[int | np.random.Generator], optional
+            Seed or generator of random numbers, by default None.
+        n_threads : Optional[int], optional
+            Number of threads across which chunks are drawn, each with an independent
+            generator spawned from `seed`, by default None (one thread).
+        chunk_size : int, optional
+            Number of samples drawn at once, which bounds the temporary memory, by
+            default 1048576.
+        out : Optional[np.ndarray], optional
+            Array of shape (n_samples, n_dims) in which to write the samples.
+
+        Returns
+        -------
+        np.ndarray
+            Samples with shape (n_samples, n_dims).
+        """
+        if self._cdf is None:
+            cdf = np.cumsum(np.clip(self._density, 0.0, None), axis=None, dtype=np.float64)
+            if cdf[-1] <= 0:
+                raise ValueError("The density has no positive mass to sample from.")
+            cdf /= cdf[-1]
+            self._cdf = cdf
+
+        if out is None:
+            out = np.empty((n_samples, self.ndim))
+        elif out.shape != (n_samples, self.ndim):
+            raise ValueError(f"Output array must have shape ({n_samples}, {self.ndim}).")
+
+        rng = np.random.default_rng(seed)
+        starts = range(0, n_samples, chunk_size)
+        if (n_threads is None) or (n_threads <= 1):
+            for start in starts:
+                self._sample_chunk(out[start : start + chunk_size], rng)
+        else:
+            rngs = rng.spawn(len(starts))
+            with ThreadPoolExecutor(max_workers=n_threads) as executor:
+                list(
+                    executor.map(
+                        lambda start, rng: self._sample_chunk(
+                            out[start : start + chunk_size], rng
+                        ),
+                        starts,
+                        rngs,
+                    )
+                )
+
+        return out
+
+    def _sample_chunk(self, out: np.ndarray, rng: np.random.Generator) -> None:
+        n_samples = out.shape[0]
+        cells = np.searchsorted(self._cdf, rng.random(n_samples), side="right")
+        cells = np.unravel_index(np.minimum(cells, self._cdf.size - 1), self.shape)
+        for d, (axis, step) in enumerate(zip(self._axes, self._steps)):
+            jitter = rng.random(n_samples) - 0.5
+            out[:, d] = np.clip(axis[cells[d]] + step * jitter, axis[0], axis[-1])
+
+
+class MultiResolutionDensity:
+    """
+    Density on a coarse grid, refined by finer patches over selected regions.
+
+    Each patch is a `DensityModel` on a finer grid together with the bounds of the region
+    it refines. Points inside of a region are evaluated on its patch, and any other point
+    on the coarse grid. It is created by `DensityEstimation.estimate_multiresolution`.
+
+    Parameters
+    ----------
+    coarse : DensityModel
+        Density on the coarse grid.
+    patches : Sequence[tuple[Sequence[tuple], DensityModel]]
+        Bounds of each refined region, one (lower, upper) pair per dimension, and the
+        density on its finer grid, which may extend beyond the region.
+    """
+
+    def __init__(
+        self,
+        coarse: DensityModel,
+        patches: Sequence[tuple[Sequence[tuple], DensityModel]] = (),
+    ) -> None:
+        self._coarse = coarse
+        self._patches = []
+        for bounds, model in patches:
+            bounds = [(float(lb), float(ub)) for lb, ub in bounds]
+            if (len(bounds) != coarse.ndim) or (model.ndim != coarse.ndim):
+                raise ValueError("Patches must have the dimensions of the coarse grid.")
+            self._patches.append((bounds, model))
+
+    @property
+    def coarse(self) -> DensityModel:
+        """
+        Density on the coarse grid.
+        """
+        return self._coarse
+
+    @property
+    def patches(self) -> list[tuple[list[tuple], DensityModel]]:
+        """
+        Bounds and density of each refined region.
+        """
+        return list(self._patches)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Bytes used by the densities of all levels.
+        """
+        return self._coarse.density.nbytes + sum(
+            model.density.nbytes for _, model in self._patches
+        )
+
+    def evaluate(
+        self,
+        points: np.ndarray,
+        *,
+        method: str = "linear",
+        fill_value: float = 0.0,
+        chunk_size: int = 2**16,
+        n_threads: Optional[int] = None,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Evaluates the density at arbitrary points on the finest level that covers them.
+
+        The arguments are those of `DensityModel.evaluate`.
+        """
+        points = np.asarray(points)
+        if (points.ndim == 1) and (self._coarse.ndim == 1):
+            points = points[:, np.newaxis]
+
+        out = self._coarse.evaluate(
+            points,
+            method=method,
+            fill_value=fill_value,
+            chunk_size=chunk_size,
+            n_threads=n_threads,
+            out=out,
+        )
+        for bounds, model in self._patches:
+            lower, upper = np.array(bounds).T
+            inside = np.all((points >= lower) & (points <= upper), axis=1)
+            if inside.any():
+                out[inside] = model.evaluate(
+                    points[inside],
+                    method=method,
+                    fill_value=fill_value,
+                    chunk_size=chunk_size,
+                    n_threads=n_threads,
+                )
+
+        return out
@@ -0,0 +1,163 @@
+"""
+Helpers to accumulate samples that arrive in chunks with bounded memory.
+"""
+
+import os
+import tempfile
+import weakref
+from typing import Optional
+
+import numpy as np
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class SampleSpool:
+    """
+    Append-only store of samples in a temporary file, readable as a memory map.
+
+    Samples are written row by row, i.e., the file holds a C-ordered array of shape
+    (n_samples, n_features), which is the memory layout that Julia reads without copying.
+    The file is removed once the spool and all memory maps created from it are released.
+    """
+
+    def __init__(
+        self,
+        n_features: int,
+        dtype=np.float64,
+        directory: Optional[str] = None,
+    ) -> None:
+        self.n_features = n_features
+        self.dtype = np.dtype(dtype)
+        self.n_samples = 0
+
+        fd, self.path = tempfile.mkstemp(
+            suffix=".samples", prefix="parallelkdepy-", dir=directory
+        )
+        self._file = os.fdopen(fd, "wb")
+        self._finalizer = weakref.finalize(self, _remove, self.path)
+
+    def append(self, chunk: np.ndarray) -> None:
+        """
+        Append a chunk of samples with shape (n_chunk, n_features).
+        """
+        chunk = np.ascontiguousarray(chunk, dtype=self.dtype)
+        if (chunk.ndim != 2) or (chunk.shape[1] != self.n_features):
+            raise ValueError(f"Chunks must have shape (n_samples, {self.n_features}).")
+
+        chunk.tofile(self._file)
+        self.n_samples += chunk.shape[0]
+
+    def to_memmap(self) -> np.memmap:
+        """
+        Read-only memory map of shape (n_samples, n_features) over all appended samples.
+        """
+        if self.n_samples == 0:
+            raise ValueError("No samples have been appended.")
+        self._file.flush()
+
+        samples = np.memmap(
+            self.path,
+            dtype=self.dtype,
+            mode="r",
+            shape=(self.n_samples, self.n_features),
+        )
+        # Keep the file until the memory map is released as well
+        weakref.finalize(samples, lambda spool: None, self)
+
+        return samples
+
+    def close(self) -> None:
+        """
+        Close the spool. The file is removed once no memory map uses it.
+        """
+        if not self._file.closed:
+            self._file.close()
+
+
+class StreamingQuantile:
+    """
+    Element-wise estimate of a quantile over a stream of equally shaped arrays.
+
+    Uses the P² algorithm of Jain and Chlamtac (1985), which tracks five markers per
+    element instead of storing the whole stream. The first five arrays are kept and their
+    exact quantile is returned until the markers are initialized.
+    """
+
+    def __init__(self, quantile: float) -> None:
+        if not 0.0 <= quantile <= 1.0:
+            raise ValueError("Quantile must be in [0, 1].")
+        self.quantile = quantile
+        self.count = 0
+        self._initial = []
+        self._heights = None
+        self._positions = None
+        p = quantile
+        self._desired = np.array([1.0, 1.0 + 2 * p, 1.0 + 4 * p, 3.0 + 2 * p, 5.0])
+        self._increments = np.array([0.0, p / 2, p, (1.0 + p) / 2, 1.0])
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Add one array to the stream.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        self.count += 1
+
+        if self._heights is None:
+            self._initial.append(np.array(values))
+            if len(self._initial) == 5:
+                self._heights = np.sort(np.stack(self._initial), axis=0)
+                self._positions = np.broadcast_to(
+                    np.arange(1.0, 6.0).reshape((5,) + (1,) * values.ndim),
+                    self._heights.shape,
+                ).copy()
+                self._initial = []
+            return
+
+        q = self._heights
+        n = self._positions
+
+        np.minimum(q[0], values, out=q[0])
+        np.maximum(q[4], values, out=q[4])
+        # Markers above the cell containing the new value move up by one position
+        for i in range(1, 5):
+            n[i] += values < q[i] if i < 4 else 1.0
+        self._desired += self._increments
+
+        for i in range(1, 4):
+            d = self._desired[i] - n[i]
+            move_up = (d >= 1.0) & (n[i + 1] - n[i] > 1.0)
+            move_down = (d <= -1.0) & (n[i - 1] - n[i] < -1.0)
+            step = np.where(move_up, 1.0, np.where(move_down, -1.0, 0.0))
+            if not step.any():
+                continue
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                parabolic = q[i] + step / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                neighbor_q = np.where(step > 0, q[i + 1], q[i - 1])
+                neighbor_n = np.where(step > 0, n[i + 1], n[i - 1])
+                linear = q[i] + step * (neighbor_q - q[i]) / (neighbor_n - n[i])
+
+            use_parabolic = (q[i - 1] < parabolic) & (parabolic < q[i + 1])
+            adjusted = np.where(use_parabolic, parabolic, linear)
+            q[i] = np.where(step != 0.0, adjusted, q[i])
+            n[i] += step
+
+    def result(self) -> np.ndarray:
+        """
+        Current estimate of the quantile.
+        """
+        if self.count == 0:
+            raise ValueError("No values have been added.")
+        if self._heights is None:
+            return np.quantile(np.stack(self._initial), self.quantile, axis=0)
+
+        return self._heights[2].copy()
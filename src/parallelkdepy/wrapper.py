@@ -2,13 +2,55 @@
 High-level API: Functions and objects that wrap Julia calls.
 """
 
-from typing import Sequence, Optional
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import Future
+from typing import Iterable, Sequence, Optional
 
-from . import core
+from . import core, interpolation, streaming
+from .model import DensityModel, MultiResolutionDensity, _conditioning
 import numpy as np
 
-# initialize Julia once
-core._init_julia()
+
+def warmup(
+    n_dims: Sequence[int] = (1, 2),
+    estimations: Sequence[str] = ("gradepro",),
+    *,
+    device: str = "cpu",
+) -> None:
+    """
+    Start the Julia runtime and compile the most common estimation calls.
+
+    Julia is otherwise started lazily on the first call that needs it. Running a
+    small estimation for each combination of dimension and estimator compiles the
+    `initialize_estimation`, `estimate_density!` and `get_density` methods that a
+    first real request would hit.
+
+    Parameters
+    ----------
+    n_dims : Sequence[int], optional
+        Numbers of dimensions to compile for, by default (1, 2).
+    estimations : Sequence[str], optional
+        Names of the estimators to compile, by default ("gradepro",).
+    device : str, optional
+        Device type, e.g., 'cpu' or 'cuda', by default 'cpu'.
+    """
+    core._init_julia()
+
+    rng = np.random.default_rng(0)
+    for n in n_dims:
+        data = rng.normal(size=(256, n))
+        for estimation in estimations:
+            density_estimation = DensityEstimation(
+                data, grid=True, dims=(16,) * n, device=device
+            )
+            density_estimation.estimate_density(estimation)
+            density_estimation.get_density()
 
 
 class Grid:
@@ -37,12 +79,70 @@ class Grid:
             self._grid_jl = grid_jl
             self._device = core.grid_device(grid_jl)
             self._shape = core.grid_shape(grid_jl)
+        self._frequency = False
+        self._key = None
+        self._axes = None
+        self._spec = None
+
+    @classmethod
+    def _from_spec(cls, spec: dict) -> "Grid":
+        """
+        Grid described by `spec` (see `_get_spec`), whose Julia object is only created
+        when it is first needed.
+        """
+        grid = cls.__new__(cls)
+        grid._grid_jl = None
+        grid._device = spec["device"]
+        grid._shape = tuple(int(n) for n in spec["shape"])
+        grid._frequency = bool(spec["frequency"])
+        grid._key = None
+        grid._axes = None
+        grid._spec = spec
+
+        return grid
+
+    def _get_spec(self) -> dict:
+        """
+        Plain Python description of the grid, from which it can be recreated. Frequency
+        grids are described by the grid they were derived from.
+        """
+        if self._spec is None:
+            if self._frequency:
+                raise ValueError("The grid this frequency grid derives from is unknown.")
+            self._spec = dict(
+                bounds=[(float(lb), float(ub)) for lb, ub in self.bounds()],
+                step=[float(st) for st in self.step()],
+                shape=list(self.shape),
+                device=self.device,
+                dtype=self.dtype().name,
+                frequency=False,
+            )
+
+        return self._spec
+
+    def __getstate__(self) -> dict:
+        return {"spec": self._get_spec()}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(Grid._from_spec(state["spec"]).__dict__)
 
     @property
     def grid_jl(self):
         """
         Underlying Julia grid object.
         """
+        if self._grid_jl is None:
+            spec = self._spec
+            ranges = [(lb, ub, n) for (lb, ub), n in zip(spec["bounds"], spec["shape"])]
+            grid_jl = core.create_grid(
+                ranges,
+                device=spec["device"],
+                b32=np.dtype(spec["dtype"]) == np.float32,
+            )
+            if spec["frequency"]:
+                grid_jl = core.grid_fftgrid(grid_jl)
+            self._grid_jl = grid_jl
+
         return self._grid_jl
 
     @property
@@ -59,23 +159,67 @@ class Grid:
         """
         return self._shape
 
-    def to_meshgrid(self) -> tuple[np.ndarray, ...]:
+    def axes(self) -> tuple[np.ndarray, ...]:
+        """
+        Read-only 1D arrays with the coordinates along each dimension of the grid.
+
+        They are computed from the start, step and length of each dimension, without
+        transferring the coordinates of the full grid from Julia.
         """
-        Mesh grid coordinates
+        if self._axes is None:
+            dtype = self.dtype()
+            axes = []
+            for lb, st, n in zip(self.lower_bounds(), self.step(), self.shape):
+                if self._frequency:
+                    # Frequencies are stored in FFT order: 0, 1, ..., -1 times the step
+                    axis = st * np.round(np.fft.fftfreq(n) * n)
+                else:
+                    axis = lb + st * np.arange(n)
+                axis = axis.astype(dtype)
+                axis.flags.writeable = False
+                axes.append(axis)
+            self._axes = tuple(axes)
+
+        return self._axes
+
+    def to_meshgrid(
+        self, copy: bool = False, sparse: bool = False
+    ) -> tuple[np.ndarray, ...]:
         """
-        return core.grid_coordinates(self._grid_jl)
+        Mesh grid coordinates.
+
+        By default, the arrays are read-only views over the coordinates computed in Julia.
+        Set `copy` to True to obtain arrays owned by Python.
+
+        With `sparse` set to True, the coordinates are built from `axes` as in
+        `np.meshgrid(..., indexing="ij", sparse=True)`: each array has length one along
+        all but its own dimension and broadcasts against the others, which requires
+        memory proportional to the sum instead of the product of the grid dimensions.
+        """
+        if sparse:
+            return tuple(
+                np.meshgrid(*self.axes(), indexing="ij", sparse=True, copy=copy)
+            )
+
+        return core.grid_coordinates(self.grid_jl, copy=copy)
 
     def step(self) -> list:
         """
         List of step sizes for each dimension of the grid.
         """
-        return core.grid_step(self._grid_jl)
+        if (self._grid_jl is None) and not self._frequency:
+            return list(self._spec["step"])
+
+        return core.grid_step(self.grid_jl)
 
     def bounds(self) -> list[tuple]:
         """
         List of tuples of bounds for each dimension of the grid.
         """
-        return core.grid_bounds(self._grid_jl)
+        if (self._grid_jl is None) and not self._frequency:
+            return [tuple(bounds) for bounds in self._spec["bounds"]]
+
+        return core.grid_bounds(self.grid_jl)
 
     def lower_bounds(self) -> list:
         """
@@ -93,49 +237,83 @@ class Grid:
         """
         List of the minimum bandwidth that the grid can support in each dimension.
         """
-        return core.grid_initial_bandwidth(self._grid_jl)
+        return core.grid_initial_bandwidth(self.grid_jl)
 
     def fftgrid(self) -> "Grid":
         """
         Returns a grid of frequency components.
         """
-        return Grid(grid_jl=core.grid_fftgrid(self._grid_jl))
+        grid = Grid(grid_jl=core.grid_fftgrid(self.grid_jl))
+        grid._frequency = True
+        if not self._frequency:
+            grid._spec = dict(self._get_spec(), frequency=True)
+
+        return grid
+
+    def dtype(self) -> np.dtype:
+        """
+        Floating point type of the grid coordinates.
+        """
+        if self._grid_jl is None:
+            return np.dtype(self._spec["dtype"])
+
+        return core.grid_dtype(self.grid_jl)
+
+    def _definition(self) -> tuple:
+        """
+        Parameters that fully define the grid: per-axis start, step and length, device,
+        precision, and whether it is a grid of frequency components.
+        """
+        if self._key is None:
+            self._key = (
+                tuple(float(lb) for lb in self.lower_bounds()),
+                tuple(float(st) for st in self.step()),
+                tuple(self.shape),
+                self.device,
+                self.dtype().name,
+                self._frequency,
+            )
+
+        return self._key
 
     def __eq__(self, other: object) -> bool:
         """
         Check equality with another Grid object.
+
+        Grids are compared by their defining parameters, without building their meshgrids.
         """
         if not isinstance(other, Grid):
             return False
+        if other is self:
+            return True
 
-        equal_arrays = True
-        meshgrid_self = self.to_meshgrid()
-        meshgrid_other = other.to_meshgrid()
-        for i in range(len(self.shape)):
-            if not np.allclose(meshgrid_self[i], meshgrid_other[i]):
-                equal_arrays = False
-                break
+        return self._definition() == other._definition()
 
-        return (
-            self.device == other.device and self.shape == other.shape and equal_arrays
-        )
+    def __hash__(self) -> int:
+        return hash(self._definition())
 
 
 def initialize_dirac_sequence(
-    data: np.ndarray,
+    data: np.ndarray | str | os.PathLike,
     grid: Grid,
     *,
     bootstrap_indices: Optional[np.ndarray] = None,
     device: str = "cpu",
     method: Optional[str] = None,
+    layout: str = "samples",
+    copy: bool = False,
+    out: Optional[np.ndarray | str | os.PathLike] = None,
+    chunk_size: Optional[int] = None,
+    weights: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     """
     Initialize a Dirac sequence on the given grid.
 
     Parameters
     ----------
-    data : np.ndarray
-        Data points to initialize the Dirac sequence.
+    data : np.ndarray | str | os.PathLike
+        Data points to initialize the Dirac sequence, with shape (n_samples, n_features),
+        or the path of a `.npy` file with them, which is memory mapped.
     grid : Grid
         The grid on which to initialize the Dirac sequence.
     bootstrap_indices : Optional[np.ndarray], optional
@@ -145,38 +323,323 @@ def initialize_dirac_sequence(
         Device to store the array, e.g., 'cpu' or 'cuda', by default 'cpu'.
     method : str, optional
         Method to use for initialization, e.g., 'serial' or 'parallel', by default 'serial'.
+    layout : str, optional
+        'samples' if rows of `data` are samples, or 'features' if `data` has shape
+        (n_features, n_samples), by default 'samples'.
+    copy : bool, optional
+        Whether to return an array owned by Python, by default False. Otherwise, a
+        read-only view over the memory of the Julia result is returned.
+    out : Optional[np.ndarray | str | os.PathLike], optional
+        Preallocated array of shape (n_bootstraps, *grid.shape) to write the result into,
+        e.g. a `np.memmap`, or the path of a `.npy` file to create as a memory map, by
+        default None. With `chunk_size`, chunks are accumulated directly into it.
+    chunk_size : Optional[int], optional
+        Number of samples binned at once, by default None (all at once). Binning in
+        chunks keeps only one chunk of memory-mapped data in memory at a time. It cannot
+        be combined with `bootstrap_indices`.
+    weights : Optional[np.ndarray], optional
+        Non-negative weights of the samples with shape (n_samples,), by default None. Each
+        sample contributes to the sequence in proportion to its weight, without resampling
+        the data. Weighted samples are always binned in chunks and the result is real.
 
     Returns
     -------
     np.ndarray
         Numpy array representing the initialized Dirac sequence.
     """
-    return core.initialize_dirac_sequence(
-        data,
+    data = core.load_data(data)
+
+    if (chunk_size is None) or (weights is not None):
+        dirac_sequences = core.initialize_dirac_sequence(
+            data,
+            grid.grid_jl,
+            bootstrap_indices=bootstrap_indices,
+            device=device,
+            method=method,
+            layout=layout,
+            weights=weights,
+        )
+    else:
+        if bootstrap_indices is not None:
+            raise ValueError("Bootstrap indices cannot be binned in chunks.")
+        # Chunks are accumulated straight into `out`, e.g. a memory map
+        dirac_sequences = _chunked_dirac_sequence(
+            data, grid, chunk_size, device=device, method=method, layout=layout, out=out
+        )
+        if out is not None:
+            if isinstance(dirac_sequences, np.memmap):
+                dirac_sequences.flush()
+            return dirac_sequences
+
+    out = core.open_output(out, dirac_sequences.shape, dirac_sequences.dtype)
+    if out is not None:
+        np.copyto(out, dirac_sequences)
+        if isinstance(out, np.memmap):
+            out.flush()
+        return out
+
+    return np.array(dirac_sequences) if copy else dirac_sequences
+
+
+def _chunked_dirac_sequence(
+    data: np.ndarray,
+    grid: Grid,
+    chunk_size: int,
+    device: str = "cpu",
+    method: Optional[str] = None,
+    layout: str = "samples",
+    out: Optional[np.ndarray | str | os.PathLike] = None,
+) -> np.ndarray:
+    """
+    Dirac sequence of the data, binned `chunk_size` samples at a time and accumulated
+    into `out`, if given.
+    """
+    samples = data.transpose() if layout == "features" else data
+    n_samples = samples.shape[0]
+    if n_samples == 0:
+        raise ValueError("Data must contain at least one sample.")
+
+    dirac_sum = None
+    for start in range(0, n_samples, chunk_size):
+        chunk = samples[start : start + chunk_size]
+        dirac_sequence = core.initialize_dirac_sequence(
+            chunk, grid.grid_jl, device=device, method=method
+        )
+        if dirac_sum is None:
+            dirac_sum = core.open_output(out, dirac_sequence.shape, dirac_sequence.dtype)
+            if dirac_sum is None:
+                dirac_sum = np.zeros(dirac_sequence.shape, dtype=dirac_sequence.dtype)
+            else:
+                dirac_sum[...] = 0
+
+        # Dirac sequences are normalized by the number of samples, so they are
+        # accumulated weighted by the size of each chunk. Blocks of the grid are added
+        # one at a time, so that no temporary array of the size of the grid is needed.
+        weight = chunk.shape[0] / n_samples
+        block = max(2**20 // max(int(np.prod(dirac_sum.shape[2:])), 1), 1)
+        for i in range(0, dirac_sum.shape[1], block):
+            dirac_sum[:, i : i + block] += weight * dirac_sequence[:, i : i + block]
+
+    return dirac_sum
+
+
+def estimate_many(
+    datasets: Sequence[np.ndarray],
+    grid: Grid | bool = True,
+    estimation: str = "gradepro",
+    *,
+    dims: Optional[Sequence] = None,
+    grid_bounds: Optional[Sequence] = None,
+    grid_padding: Optional[Sequence] = None,
+    device: str = "cpu",
+    layout: str = "samples",
+    implementation: Optional[str] = None,
+    copy: bool = False,
+    out: Optional[np.ndarray] = None,
+    **kwargs,
+) -> np.ndarray:
+    """
+    Estimates the densities of many independent datasets on a shared grid.
+
+    All datasets are submitted to Julia at once and estimated in parallel over the Julia
+    threads, which avoids the per-dataset overhead of `DensityEstimation`.
+
+    Parameters
+    ----------
+    datasets : Sequence[np.ndarray]
+        Datasets with shape (n_samples, n_features) each. The number of samples may
+        differ between datasets.
+    grid : Grid | bool, optional
+        Grid shared by all estimations, or True to find a grid covering all datasets,
+        by default True.
+    estimation : str, optional
+        Name of the estimator, by default 'gradepro'.
+    dims : Optional[Sequence], optional
+        Number of grid points per dimension when a grid is found, by default None.
+    grid_bounds : Optional[Sequence], optional
+        Grid bounds when a grid is found, by default None.
+    grid_padding : Optional[Sequence], optional
+        Grid padding when a grid is found, by default None.
+    device : str, optional
+        Device type, e.g., 'cpu' or 'cuda', by default 'cpu'.
+    layout : str, optional
+        'samples' if rows of the datasets are samples, or 'features' if the datasets have
+        shape (n_features, n_samples), by default 'samples'.
+    implementation : Optional[str], optional
+        Implementation of the estimator, e.g., 'serial' or 'threaded', by default None,
+        which uses the one set with `configure`, if any.
+    copy : bool, optional
+        Whether to return an array owned by Python, by default False. Otherwise, a
+        read-only view over the memory of the Julia result is returned.
+    out : Optional[np.ndarray], optional
+        Preallocated array of shape (n_datasets, *grid.shape) to write the result into.
+    **kwargs
+        Keyword arguments of the estimator.
+
+    Returns
+    -------
+    np.ndarray
+        Stacked densities with shape (n_datasets, *grid.shape).
+    """
+    if len(datasets) == 0:
+        raise ValueError("At least one dataset must be provided.")
+
+    if isinstance(grid, Grid):
+        if grid.device != device:
+            raise ValueError(
+                f"Grid device {grid.device} does not match the requested device {device}."
+            )
+    elif grid is True:
+        axis = 1 if layout == "features" else 0
+        grid = Grid(
+            grid_jl=core.find_grid(
+                np.concatenate(datasets, axis=axis),
+                grid_dims=dims,
+                grid_bounds=grid_bounds,
+                grid_padding=grid_padding,
+                device=device,
+                layout=layout,
+            )
+        )
+    else:
+        raise ValueError(
+            "Grid must be a Grid object or True to find a grid covering all datasets."
+        )
+
+    densities = core.estimate_many(
+        datasets,
         grid.grid_jl,
-        bootstrap_indices=bootstrap_indices,
+        estimation,
         device=device,
-        method=method,
+        layout=layout,
+        implementation=core.resolve_implementation(device, implementation),
+        **kwargs,
     )
 
+    if out is not None:
+        np.copyto(out, densities)
+        return out
+
+    return np.array(densities) if copy else densities
+
+
+BootstrapResult = namedtuple("BootstrapResult", ["mean", "std", "quantiles"])
+BootstrapResult.__doc__ = """
+Summary of bootstrap densities: element-wise mean, standard deviation, and quantiles
+stacked along the first axis in the order they were requested.
+"""
+
+
+# Version of the file format written by `DensityEstimation.save`
+_SAVE_FORMAT = 1
+
+
+def _json_default(value):
+    """
+    JSON representation of NumPy values, and of any other value by its repr.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+
+    return repr(value)
+
+
+def _model_axes(grid: Grid) -> list[np.ndarray]:
+    """
+    Axes of a spatial grid in double precision, computed from its bounds and step.
+    """
+    return [
+        lb + st * np.arange(n, dtype=np.float64)
+        for lb, st, n in zip(grid.lower_bounds(), grid.step(), grid.shape)
+    ]
+
+
+def _cache_key(kwargs: dict) -> Optional[tuple]:
+    """
+    Hashable key for a set of keyword arguments, or None if a value is not hashable.
+    """
+    key = tuple(sorted(kwargs.items()))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+
+    return key
+
 
 class DensityEstimation:
     """
     Main API object for density estimation.
+
+    The data is handed to Julia without copying if it is a C-ordered array of shape
+    (n_samples, n_features), or a Fortran-ordered array of shape (n_features, n_samples)
+    passed with `layout="features"`. Any other input is converted once, which is reported
+    by `data_copied`. Data shared with Julia must not be modified in place.
+
+    `implementation` sets the default implementation of the estimators, e.g., 'serial'
+    for small jobs or 'threaded' for large ones. If None, the one set with `configure`
+    is used, if any.
+
+    `data` may also be a `np.memmap`, or the path of a `.npy` file, which is memory mapped.
+    Samples can also be streamed in chunks with `partial_fit` (or `from_chunks`), in which
+    case `data` may be None and a Grid must be given.
+
+    `dtype` sets the precision of the estimation, e.g., `np.float32` to halve the memory of
+    data, grids and densities. It defaults to the precision of the given Grid, if any, and
+    otherwise to that of the data.
+
+    Sample weights are not accepted, as the estimators of ParallelKDE.jl do not take them.
+    The Dirac sequence of weighted samples is binned by `initialize_dirac_sequence`.
+
+    Estimated densities can be stored with `save` and restored with `load`, which does not
+    start Julia. Objects can also be pickled, in which case the data is included as well.
     """
 
     def __init__(
         self,
-        data: np.ndarray,
+        data: Optional[np.ndarray | str | os.PathLike],
         *,
         grid: Grid | bool = False,
         dims: Optional[Sequence] = None,
         grid_bounds: Optional[Sequence] = None,
         grid_padding: Optional[Sequence] = None,
         device: str = "cpu",
+        layout: str = "samples",
+        implementation: Optional[str] = None,
+        dtype: Optional[np.dtype] = None,
     ) -> None:
+        core.resolve_implementation(device, implementation)
+        self._implementation = implementation
+        if isinstance(grid, Grid):
+            if (dtype is not None) and (np.dtype(dtype) != grid.dtype()):
+                raise ValueError(
+                    f"Grid precision {grid.dtype()} does not match dtype {np.dtype(dtype)}."
+                )
+            dtype = grid.dtype()
+        self._dtype = None if dtype is None else np.dtype(dtype)
+        if self._dtype not in (None, np.float32, np.float64):
+            raise ValueError("Only float32 and float64 precision are supported.")
+        data = core.load_data(data)
         self._data = data
+        if data is not None:
+            self._data_buffer, self._data_copied = core.prepare_data(
+                data, layout=layout, dtype=self._dtype
+            )
+        elif not isinstance(grid, Grid):
+            raise ValueError("A Grid must be provided when no data is given.")
+        else:
+            self._data_buffer, self._data_copied = None, False
         self._device = device
+        self._found_grids = {}
+        self._spool = None
+        self._dirac_cache = None
+        self._layout = layout
+        self._grid_kwargs = dict(
+            dims=dims, grid_bounds=grid_bounds, grid_padding=grid_padding
+        )
+        self._lock = threading.RLock()
 
         if isinstance(grid, Grid):
             if grid.device != device:
@@ -185,15 +648,7 @@ class DensityEstimation:
                 )
             self._grid = grid
         elif grid is True:
-            self._grid = Grid(
-                grid_jl=core.find_grid(
-                    data,
-                    grid_dims=dims,
-                    grid_bounds=grid_bounds,
-                    grid_padding=grid_padding,
-                    device=device,
-                )
-            )
+            self._grid = self._find_grid(dims, grid_bounds, grid_padding)
         elif grid is False:
             self._grid = None
         else:
@@ -201,28 +656,344 @@ class DensityEstimation:
                 "Grid must be a Grid object, True to find an appropriate grid, or False to not use a grid."
             )
 
-        if self._grid is not None:
-            self._densityestimation_jl = core.create_density_estimation(
-                data, grid=self._grid.grid_jl, device=device
+        self._density_cache = {}
+        self._last_run_stats = None
+        self._create_estimation()
+
+    @classmethod
+    def from_chunks(
+        cls, chunks: Iterable[np.ndarray], grid: Grid, **kwargs
+    ) -> "DensityEstimation":
+        """
+        Creates a density estimation from an iterable of data chunks.
+
+        Parameters
+        ----------
+        chunks : Iterable[np.ndarray]
+            Chunks of data, each with shape (n_samples, n_features).
+        grid : Grid
+            Grid for the estimation.
+        **kwargs
+            Keyword arguments of `DensityEstimation`.
+        """
+        density_estimation = cls(None, grid=grid, **kwargs)
+        for chunk in chunks:
+            density_estimation.partial_fit(chunk)
+
+        return density_estimation
+
+    def _create_estimation(self) -> None:
+        # The Julia object is created when first needed
+        self._densityestimation_jl = None
+        self._estimation_params = None
+        self._multiresolution = None
+        self._invalidate()
+
+    def _restore_estimate(self, estimation_params: dict, density: np.ndarray) -> None:
+        """
+        Serve `density` as the estimate obtained with `estimation_params`.
+        """
+        density = np.asarray(density)
+        density.flags.writeable = False
+        self._estimation_params = estimation_params
+        self._density_cache[_cache_key({})] = density
+
+    @property
+    def estimation_params(self) -> Optional[dict]:
+        """
+        Estimator, implementation and keyword arguments of the last estimate, if any.
+        """
+        if self._estimation_params is None:
+            return None
+
+        return dict(self._estimation_params, kwargs=dict(self._estimation_params["kwargs"]))
+
+    def save(
+        self,
+        path: str | os.PathLike,
+        *,
+        dtype: Optional[np.dtype] = None,
+        compress: bool = True,
+    ) -> None:
+        """
+        Saves the estimated density to a `.npz` file.
+
+        The file holds the definition of the grid, the density and the parameters of the
+        estimate, but not the data. It is restored with `DensityEstimation.load`.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            Path of the file.
+        dtype : Optional[np.dtype], optional
+            Floating point type in which to store the density, e.g., `np.float32` to halve
+            the size of the file, by default None (the type of the estimate).
+        compress : bool, optional
+            Whether to compress the file, by default True.
+        """
+        with self._lock:
+            if self._estimation_params is None:
+                raise ValueError("The density has not been estimated yet.")
+            density = self.get_density()
+            grid = self._estimation_grid()
+            metadata = dict(
+                format=_SAVE_FORMAT,
+                grid=grid._get_spec(),
+                device=self._device,
+                implementation=self._implementation,
+                dtype=None if self._dtype is None else self._dtype.name,
+                estimation_params=self._estimation_params,
             )
-        else:
-            self._densityestimation_jl = core.create_density_estimation(
-                data,
-                grid=False,
-                dims=dims,
-                grid_bounds=grid_bounds,
-                grid_padding=grid_padding,
-                device=device,
+
+        if dtype is not None:
+            density = density.astype(dtype, copy=False)
+        savez = np.savez_compressed if compress else np.savez
+        savez(
+            path,
+            metadata=np.array(json.dumps(metadata, default=_json_default)),
+            density=density,
+        )
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> "DensityEstimation":
+        """
+        Loads a density estimation stored with `save`.
+
+        Julia is not started to load it: `density`, `get_density` without arguments, and
+        `evaluate` are served from the stored density. As the data is not stored, new
+        estimates require new data or chunks first.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            Path of the file.
+
+        Returns
+        -------
+        DensityEstimation
+            Density estimation on the stored grid.
+        """
+        with np.load(path, allow_pickle=False) as stored:
+            metadata = json.loads(str(stored["metadata"]))
+            density = stored["density"]
+        if metadata.get("format") != _SAVE_FORMAT:
+            raise ValueError(f"Unsupported file format: {metadata.get('format')}.")
+
+        density_estimation = cls(
+            None,
+            grid=Grid._from_spec(metadata["grid"]),
+            device=metadata["device"],
+            implementation=metadata["implementation"],
+        )
+        density_estimation._restore_estimate(metadata["estimation_params"], density)
+
+        return density_estimation
+
+    def __getstate__(self) -> dict:
+        with self._lock:
+            data = self.data
+            if (self._spool is not None) and (self._layout == "features"):
+                # Streamed samples are spooled as (n_samples, n_features)
+                data = data.transpose()
+            estimated = self._estimation_params is not None
+
+            return dict(
+                data=None if data is None else np.asarray(data),
+                grid=self._grid,
+                grid_kwargs=self._grid_kwargs,
+                device=self._device,
+                layout=self._layout,
+                implementation=self._implementation,
+                dtype=None if self._dtype is None else self._dtype.name,
+                estimation_params=self._estimation_params,
+                density=np.asarray(self.get_density()) if estimated else None,
             )
-        self._density = core.get_density(self._densityestimation_jl)
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(
+            state["data"],
+            grid=False if state["grid"] is None else state["grid"],
+            device=state["device"],
+            layout=state["layout"],
+            implementation=state["implementation"],
+            dtype=state["dtype"],
+            **state["grid_kwargs"],
+        )
+        if state["estimation_params"] is not None:
+            self._restore_estimate(state["estimation_params"], state["density"])
+
+    def _estimation_jl(self):
+        """
+        Julia estimation object for the current data and grid.
+        """
+        with self._lock:
+            if self._densityestimation_jl is None:
+                data = self._estimation_data()
+                if self._grid is not None:
+                    self._densityestimation_jl = core.create_density_estimation(
+                        data,
+                        grid=self._grid.grid_jl,
+                        device=self._device,
+                        layout="features",
+                    )
+                else:
+                    self._densityestimation_jl = core.create_density_estimation(
+                        data,
+                        grid=False,
+                        device=self._device,
+                        layout="features",
+                        **self._grid_kwargs,
+                    )
+
+            return self._densityestimation_jl
+
+    def _invalidate(self) -> None:
+        """
+        Discard results computed for a previous state of the estimation.
+        """
+        self._density_cache.clear()
 
     @property
     def data(self):
         """
-        Numpy array of data points for density estimation.
+        Numpy array of data points for density estimation, as it was provided.
+
+        For streamed data, a read-only memory map over all chunks received so far, with
+        shape (n_samples, n_features) whatever the layout.
         """
+        if (self._data is None) and (self._spool is not None):
+            self._estimation_data()
+
         return self._data
 
+    @data.setter
+    def data(self, value: np.ndarray | str | os.PathLike):
+        value = core.load_data(value)
+        with self._lock:
+            self._data_buffer, self._data_copied = core.prepare_data(
+                value, layout=self._layout, dtype=self._dtype
+            )
+            self._data = value
+            self._spool = None
+            self._dirac_cache = None
+            self._found_grids.clear()
+            self._create_estimation()
+
+    @property
+    def n_samples(self) -> int:
+        """
+        Number of samples in the data, including all streamed chunks.
+        """
+        if self._spool is not None:
+            return self._spool.n_samples
+        if self._data_buffer is None:
+            return 0
+
+        return self._data_buffer.shape[-1]
+
+    def partial_fit(
+        self,
+        chunk: np.ndarray,
+        *,
+        spool_dir: Optional[str] = None,
+    ):
+        """
+        Adds a chunk of samples to the data.
+
+        The chunk is appended to a temporary file. The estimators of ParallelKDE.jl need
+        the samples themselves, so `estimate_density` reads them back through a memory map,
+        without holding them in Python memory. Chunks are not binned as they arrive:
+        `dirac_sequence` bins the spooled samples, chunk by chunk, when it is requested.
+
+        Parameters
+        ----------
+        chunk : np.ndarray
+            Chunk of data with shape (n_samples, n_features), or (n_features, n_samples)
+            if the object was created with `layout="features"`.
+        spool_dir : Optional[str], optional
+            Directory of the temporary file, used when the first chunk is added. By
+            default None, which uses the system's temporary directory.
+
+        Returns
+        -------
+        DensityEstimation
+            The object itself.
+        """
+        if self._grid is None:
+            raise ValueError("A Grid is required to add data in chunks.")
+
+        chunk = np.asarray(chunk)
+        if chunk.ndim == 1:
+            chunk = chunk[:, np.newaxis]
+        elif self._layout == "features":
+            chunk = chunk.transpose()
+
+        with self._lock:
+            if self._spool is None:
+                self._spool = streaming.SampleSpool(
+                    len(self._grid.shape), dtype=self._grid.dtype(), directory=spool_dir
+                )
+                if self._data_buffer is not None:
+                    self._spool.append(np.atleast_2d(self._data_buffer).transpose())
+            self._spool.append(chunk)
+            self._dirac_cache = None
+
+            self._data = None
+            self._data_buffer = None
+            self._found_grids.clear()
+            self._create_estimation()
+
+        return self
+
+    def dirac_sequence(self, chunk_size: Optional[int] = None) -> np.ndarray:
+        """
+        Returns the Dirac sequence of all samples on the grid.
+
+        It is computed when first requested and kept until the data or the grid change.
+        `chunk_size` sets the number of samples binned at once, e.g., for memory-mapped
+        data, by default None, which bins streamed data in chunks of 2^20 samples and
+        other data all at once.
+        """
+        if self._grid is None:
+            raise ValueError("A Grid is required to compute the Dirac sequence.")
+
+        with self._lock:
+            if self._dirac_cache is None:
+                if (chunk_size is None) and (self._spool is not None):
+                    chunk_size = 2**20
+                dirac_sequence = initialize_dirac_sequence(
+                    np.atleast_2d(self._estimation_data()),
+                    self._grid,
+                    device=self._device,
+                    method=core.resolve_implementation(self._device, self._implementation),
+                    layout="features",
+                    chunk_size=chunk_size,
+                )[0]
+                dirac_sequence.flags.writeable = False
+                self._dirac_cache = dirac_sequence
+
+            return self._dirac_cache
+
+    def _estimation_data(self) -> np.ndarray:
+        """
+        Data in the layout handed to Julia, mapping streamed chunks from disk if needed.
+        """
+        with self._lock:
+            if (self._data_buffer is None) and (self._spool is not None):
+                self._data = self._spool.to_memmap()
+                self._data_buffer, self._data_copied = core.prepare_data(self._data)
+            if self._data_buffer is None:
+                raise ValueError("No data has been provided for the estimation.")
+
+            return self._data_buffer
+
+    @property
+    def data_copied(self) -> bool:
+        """
+        Whether the data had to be copied to hand it over to Julia.
+        """
+        return self._data_copied
+
     @property
     def device(self):
         """
@@ -230,6 +1001,13 @@ class DensityEstimation:
         """
         return self._device
 
+    @property
+    def dtype(self) -> Optional[np.dtype]:
+        """
+        Floating point precision of the estimation, if set by `dtype` or by the grid.
+        """
+        return self._dtype
+
     @property
     def grid(self):
         """
@@ -245,10 +1023,17 @@ class DensityEstimation:
             raise ValueError(
                 f"Grid device {value.device} does not match DensityEstimation device {self._device}."
             )
-        self._grid = value
-        self._densityestimation_jl = core.create_density_estimation(
-            self.data, grid=self._grid.grid_jl, device=self._device
-        )
+        with self._lock:
+            if value.dtype() != self._dtype:
+                # The data follows the precision of the grid
+                self._dtype = value.dtype()
+                if (self._data is not None) and (self._spool is None):
+                    self._data_buffer, self._data_copied = core.prepare_data(
+                        self._data, layout=self._layout, dtype=self._dtype
+                    )
+            self._grid = value
+            self._dirac_cache = None
+            self._create_estimation()
 
     @property
     def density(self):
@@ -257,6 +1042,31 @@ class DensityEstimation:
         """
         return self.get_density()
 
+    def _find_grid(
+        self,
+        dims: Optional[Sequence] = None,
+        grid_bounds: Optional[Sequence] = None,
+        grid_padding: Optional[Sequence] = None,
+    ) -> Grid:
+        """
+        Grid found for the data, memoized per set of parameters until the data changes.
+        """
+        key = (core._freeze(dims), core._freeze(grid_bounds), core._freeze(grid_padding))
+        if key not in self._found_grids:
+            self._found_grids[key] = Grid(
+                grid_jl=core.find_grid(
+                    self._estimation_data(),
+                    dtype=self._dtype,
+                    grid_dims=dims,
+                    grid_bounds=grid_bounds,
+                    grid_padding=grid_padding,
+                    device=self.device,
+                    layout="features",
+                )
+            )
+
+        return self._found_grids[key]
+
     def generate_grid(
         self,
         dims: Optional[Sequence] = None,
@@ -273,41 +1083,729 @@ class DensityEstimation:
             A Grid object representing the generated grid.
         """
         if overwrite:
-            self.grid = Grid(
-                grid_jl=core.find_grid(
-                    self.data,
-                    grid_dims=dims,
-                    grid_bounds=grid_bounds,
-                    grid_padding=grid_padding,
-                    device=self.device,
-                )
-            )
+            self.grid = self._find_grid(dims, grid_bounds, grid_padding)
 
             return self.grid
         else:
             if isinstance(self.grid, Grid):
                 return self.grid
             else:
-                return Grid(
-                    grid_jl=core.find_grid(
-                        self.data,
-                        grid_dims=dims,
-                        grid_bounds=grid_bounds,
-                        grid_padding=grid_padding,
-                        device=self.device,
+                return self._find_grid(dims, grid_bounds, grid_padding)
+
+    def _estimation_grid(self) -> Grid:
+        """
+        Grid on which the density is estimated.
+        """
+        return self.generate_grid(**self._grid_kwargs)
+
+    def evaluate(
+        self,
+        points: np.ndarray,
+        *,
+        method: str = "linear",
+        fill_value: float = 0.0,
+        chunk_size: int = 2**16,
+        n_threads: Optional[int] = None,
+        out: Optional[np.ndarray] = None,
+        **kwargs,
+    ) -> np.ndarray:
+        """
+        Evaluates the estimated density at arbitrary points by interpolation on the grid.
+
+        After `estimate_multiresolution`, points are evaluated on the finest level that
+        covers them.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            Points with shape (n_points, n_features).
+        method : str, optional
+            'linear' for multilinear or 'cubic' for cubic interpolation, by default
+            'linear'.
+        fill_value : float, optional
+            Density assigned to points outside of the grid, by default 0.0.
+        chunk_size : int, optional
+            Number of points interpolated at once, by default 65536.
+        n_threads : Optional[int], optional
+            Number of threads to distribute the chunks over, by default None (one thread).
+        out : Optional[np.ndarray], optional
+            Preallocated array of shape (n_points,) to write the result into.
+        **kwargs
+            Keyword arguments passed to `get_density`.
+
+        Returns
+        -------
+        np.ndarray
+            Density at each point, with shape (n_points,).
+        """
+        if (self._multiresolution is not None) and not kwargs:
+            return self._multiresolution.evaluate(
+                points,
+                method=method,
+                fill_value=fill_value,
+                chunk_size=chunk_size,
+                n_threads=n_threads,
+                out=out,
+            )
+        grid = self._estimation_grid()
+
+        return interpolation.interpolate(
+            self.get_density(**kwargs),
+            grid.lower_bounds(),
+            grid.step(),
+            points,
+            method=method,
+            fill_value=fill_value,
+            chunk_size=chunk_size,
+            n_threads=n_threads,
+            out=out,
+        )
+
+    @property
+    def multiresolution(self) -> Optional[MultiResolutionDensity]:
+        """
+        Result of the last estimate if it was made with `estimate_multiresolution`.
+        """
+        return self._multiresolution
+
+    def estimate_multiresolution(
+        self,
+        estimation: str = "gradepro",
+        *,
+        threshold: float = 0.01,
+        refinement: int = 4,
+        tile: int = 8,
+        implementation: Optional[str] = None,
+        **kwargs,
+    ) -> MultiResolutionDensity:
+        """
+        Estimates the density on the grid, and again on finer grids where it is high.
+
+        The grid is divided in tiles of `tile` cells per dimension. Tiles where the coarse
+        density reaches `threshold` times its maximum are estimated again, on a grid
+        `refinement` times finer, from the samples that fall in the tile padded by three
+        rule-of-thumb bandwidths, computed from a scale robust to heavy tails and capped at
+        one tile. The patch density is scaled by the fraction of samples
+        it received, and only used within its tile. Only the tiles that need it are
+        refined, so memory and time grow with the size of the dense regions rather than
+        with the whole grid.
+
+        Patches are estimated independently, with bandwidths chosen for their samples, so
+        the density may still be discontinuous at the boundary between a patch and the
+        coarse grid or another patch.
+
+        Parameters
+        ----------
+        estimation : str, optional
+            Name of the estimator, by default 'gradepro'.
+        threshold : float, optional
+            Fraction of the maximum coarse density above which a tile is refined, by
+            default 0.01.
+        refinement : int, optional
+            Factor by which the resolution of refined tiles is increased, by default 4.
+        tile : int, optional
+            Number of coarse cells per dimension of a tile, by default 8.
+        implementation : Optional[str], optional
+            Implementation of the estimator, by default None.
+        **kwargs
+            Keyword arguments of the estimator.
+
+        Returns
+        -------
+        MultiResolutionDensity
+            Coarse density and refined patches, which `evaluate` also uses from then on.
+        """
+        if (refinement < 1) or (tile < 1):
+            raise ValueError("Refinement and tile size must be positive.")
+
+        with self._lock:
+            self.estimate_density(estimation, implementation=implementation, **kwargs)
+            grid = self._estimation_grid()
+            axes = _model_axes(grid)
+            steps = np.array(grid.step())
+            density = self.get_density()
+            samples = np.atleast_2d(self._estimation_data()).transpose()
+            n_samples, n_dims = samples.shape
+            refine = density >= threshold * density.max()
+
+            # Tiles are padded by three rule-of-thumb bandwidths, so that patches see the
+            # samples whose kernels reach into the tile. The scale is robust to heavy
+            # tails, and the padding is capped at one tile.
+            std = samples.std(axis=0)
+            iqr = np.subtract(*np.percentile(samples, [75, 25], axis=0))
+            scale = np.where(iqr > 0, np.minimum(std, iqr / 1.34), std)
+            bandwidths = scale * (4 / ((n_dims + 2) * n_samples)) ** (1 / (n_dims + 4))
+            pad = np.clip(np.ceil(3 * bandwidths / steps), 1, tile).astype(np.intp)
+
+            # Samples are sorted by tile once, and each patch only looks at the tiles that
+            # its padded extent overlaps
+            tile_starts = [range(0, max(n - 1, 1), tile) for n in grid.shape]
+            tile_shape = tuple(len(starts) for starts in tile_starts)
+            cells = np.floor((samples - [axis[0] for axis in axes]) / steps)
+            tiles = np.clip(cells // tile, 0, np.array(tile_shape) - 1).astype(np.intp)
+            flat_tiles = np.ravel_multi_index(tuple(tiles.T), tile_shape)
+            order = np.argsort(flat_tiles, kind="stable")
+            offsets = np.searchsorted(
+                flat_tiles[order], np.arange(np.prod(tile_shape) + 1)
+            )
+            reach = -(-pad // tile)
+
+            patches = []
+            for starts in itertools.product(*tile_starts):
+                stops = [min(i + tile, n - 1) for i, n in zip(starts, grid.shape)]
+                nodes = tuple(slice(i, j + 1) for i, j in zip(starts, stops))
+                if not refine[nodes].any():
+                    continue
+
+                bounds = [
+                    (float(axis[i]), float(axis[j]))
+                    for axis, i, j in zip(axes, starts, stops)
+                ]
+                padded = [
+                    (lb - p * st, ub + p * st)
+                    for (lb, ub), p, st in zip(bounds, pad, steps)
+                ]
+                neighbours = itertools.product(
+                    *(
+                        range(max(i // tile - r, 0), min(i // tile + r, m - 1) + 1)
+                        for i, r, m in zip(starts, reach, tile_shape)
                     )
                 )
+                candidates = np.concatenate(
+                    [
+                        order[offsets[f] : offsets[f + 1]]
+                        for f in (np.ravel_multi_index(t, tile_shape) for t in neighbours)
+                    ]
+                )
+                lower, upper = np.array(padded).T
+                inside = candidates[
+                    np.all(
+                        (samples[candidates] >= lower) & (samples[candidates] <= upper),
+                        axis=1,
+                    )
+                ]
+                if inside.shape[0] < 2:
+                    continue
 
-    def estimate_density(self, estimation: str, **kwargs) -> None:
+                # Patch grids are not shared, so they stay out of the grid cache
+                patch_grid = Grid(
+                    grid_jl=core.create_grid(
+                        [
+                            (lb, ub, (j - i + 2 * p) * refinement + 1)
+                            for (lb, ub), i, j, p in zip(padded, starts, stops, pad)
+                        ],
+                        device=self._device,
+                        b32=grid.dtype() == np.float32,
+                        cache=False,
+                    )
+                )
+                patch = DensityEstimation(
+                    np.ascontiguousarray(samples[np.sort(inside)]),
+                    grid=patch_grid,
+                    device=self._device,
+                    implementation=self._implementation,
+                )
+                patch.estimate_density(
+                    estimation, implementation=implementation, **kwargs
+                )
+                fraction = inside.shape[0] / n_samples
+                patches.append(
+                    (
+                        bounds,
+                        DensityModel(
+                            _model_axes(patch_grid), patch.get_density() * fraction
+                        ),
+                    )
+                )
+
+            self._multiresolution = MultiResolutionDensity(
+                DensityModel(axes, density), patches
+            )
+            self._estimation_params = dict(
+                self._estimation_params,
+                multiresolution=dict(threshold=threshold, refinement=refinement, tile=tile),
+            )
+
+            return self._multiresolution
+
+    def _resident_density(self) -> bool:
+        """
+        Whether the density lives in Julia, as opposed to having been restored with
+        `load` or unpickled.
+        """
+        return (self._densityestimation_jl is not None) or (
+            _cache_key({}) not in self._density_cache
+        )
+
+    def marginal(self, dims: int | Sequence[int], **kwargs) -> np.ndarray:
+        """
+        Marginal density over the given dimensions.
+
+        The other dimensions are integrated out with the rectangle rule, weighted by
+        `Grid.step()`. This runs in Julia on the estimated density, so only the reduced
+        array is transferred, and the result is cached per set of dimensions until the
+        next estimate.
+
+        Parameters
+        ----------
+        dims : int | Sequence[int]
+            Dimension or dimensions to keep, in the order they should have.
+        **kwargs
+            Keyword arguments passed to `get_density` of ParallelKDE.jl.
+
+        Returns
+        -------
+        np.ndarray
+            Read-only marginal density on the grid of the kept dimensions.
+        """
+        n_dims = len(self._estimation_grid().shape)
+        dims = [dims] if np.isscalar(dims) else list(dims)
+        dims = [int(d) % n_dims for d in dims]
+        if (len(dims) == 0) or (len(set(dims)) != len(dims)):
+            raise ValueError("Dimensions to keep must be unique and non-empty.")
+
+        kwargs_key = _cache_key(kwargs)
+        key = ("marginal", tuple(dims), kwargs_key)
+        with self._lock:
+            marginal = self._density_cache.get(key) if kwargs_key is not None else None
+            if marginal is None:
+                if self._resident_density():
+                    kept = sorted(dims)
+                    marginal = core.marginal_density(
+                        self._estimation_jl(),
+                        self._estimation_grid().grid_jl,
+                        kept,
+                        **kwargs,
+                    )
+                    marginal = np.moveaxis(
+                        marginal, [kept.index(d) for d in dims], range(len(dims))
+                    )
+                else:
+                    marginal = self.to_model(**kwargs).marginal(dims).density
+                if kwargs_key is not None:
+                    self._density_cache[key] = marginal
+
+        return marginal
+
+    def conditional(
+        self, dims: int | Sequence[int], at: float | Sequence[float], **kwargs
+    ) -> np.ndarray:
+        """
+        Density of the other dimensions conditioned on `dims` taking the values `at`.
+
+        The density is interpolated linearly at `at` along `dims` and normalized to
+        integrate to one over the remaining dimensions. As `marginal`, it runs in Julia on
+        the estimated density and is cached until the next estimate.
+
+        Parameters
+        ----------
+        dims : int | Sequence[int]
+            Dimension or dimensions on which to condition.
+        at : float | Sequence[float]
+            Value of each dimension in `dims`.
+        **kwargs
+            Keyword arguments passed to `get_density` of ParallelKDE.jl.
+
+        Returns
+        -------
+        np.ndarray
+            Read-only conditional density on the grid of the remaining dimensions, in
+            their original order.
+        """
+        grid = self._estimation_grid()
+        dims, positions = _conditioning(dims, at, grid.bounds(), grid.step())
+
+        kwargs_key = _cache_key(kwargs)
+        key = ("conditional", tuple(dims), tuple(positions), kwargs_key)
+        with self._lock:
+            conditional = (
+                self._density_cache.get(key) if kwargs_key is not None else None
+            )
+            if conditional is None:
+                if self._resident_density():
+                    conditional = core.conditional_density(
+                        self._estimation_jl(), grid.grid_jl, dims, positions, **kwargs
+                    )
+                else:
+                    conditional = self.to_model(**kwargs).conditional(dims, at).density
+                if kwargs_key is not None:
+                    self._density_cache[key] = conditional
+
+        return conditional
+
+    def sample(
+        self,
+        n_samples: int,
+        *,
+        seed: Optional[int | np.random.Generator] = None,
+        n_threads: Optional[int] = None,
+        out: Optional[np.ndarray] = None,
+        **kwargs,
+    ) -> np.ndarray:
+        """
+        Draws samples from the estimated density.
+
+        The cumulative distribution of the density on the grid is built once and cached
+        until the next estimate. Samples are drawn from it by vectorized inverse transform
+        sampling, and placed uniformly within their grid cell (see `DensityModel.sample`).
+
+        Parameters
+        ----------
+        n_samples : int
+            Number of samples.
+        seed : Optional[int | np.random.Generator], optional
+            Seed or generator of random numbers, by default None.
+        n_threads : Optional[int], optional
+            Number of threads across which the samples are drawn, by default None (one
+            thread).
+        out : Optional[np.ndarray], optional
+            Preallocated array of shape (n_samples, n_features) to write the samples into.
+        **kwargs
+            Keyword arguments passed to `get_density`.
+
+        Returns
+        -------
+        np.ndarray
+            Samples with shape (n_samples, n_features).
+        """
+        kwargs_key = _cache_key(kwargs)
+        key = ("model", kwargs_key)
+        with self._lock:
+            model = self._density_cache.get(key) if kwargs_key is not None else None
+            if model is None:
+                model = self.to_model(**kwargs)
+                if kwargs_key is not None:
+                    self._density_cache[key] = model
+
+        return model.sample(n_samples, seed=seed, n_threads=n_threads, out=out)
+
+    def to_model(self, **kwargs) -> DensityModel:
+        """
+        Pure NumPy model of the estimated density, which does not need Julia to be
+        evaluated, marginalized or sampled.
+
+        Parameters
+        ----------
+        **kwargs
+            Keyword arguments passed to `get_density`.
+        """
+        return DensityModel(_model_axes(self._estimation_grid()), self.get_density(**kwargs))
+
+    def bootstrap(
+        self,
+        n_bootstraps: int,
+        estimation: str = "gradepro",
+        *,
+        seed: Optional[int] = None,
+        quantiles: Sequence[float] = (0.05, 0.95),
+        batch_size: Optional[int] = None,
+        implementation: Optional[str] = None,
+        **kwargs,
+    ) -> BootstrapResult:
+        """
+        Estimates the density of bootstrap replicates of the data.
+
+        The replicates are resampled in Julia from multinomial counts, instead of an
+        index matrix, and estimated in batches over the Julia threads. The estimators
+        need the samples themselves, so each replicate of a batch is a full copy of the
+        data: a batch holds `batch_size` times the memory of the data, on top of its
+        densities. Only running summaries are kept: the mean and standard deviation, and
+        P² estimates of the quantiles, which are approximate once there are more than
+        five replicates.
+
+        Parameters
+        ----------
+        n_bootstraps : int
+            Number of bootstrap replicates.
+        estimation : str, optional
+            Name of the estimator, by default 'gradepro'.
+        seed : Optional[int], optional
+            Seed of the resampling, by default None.
+        quantiles : Sequence[float], optional
+            Quantiles of the bootstrap densities to estimate, by default (0.05, 0.95).
+        batch_size : Optional[int], optional
+            Number of replicates estimated at once, by default None, which uses the number
+            of Julia threads. Memory grows with the batch size, by one copy of the data
+            and one density per replicate.
+        implementation : Optional[str], optional
+            Implementation of the estimator, by default None, which uses the default of
+            the object.
+        **kwargs
+            Keyword arguments of the estimator.
+
+        Returns
+        -------
+        BootstrapResult
+            Mean, standard deviation and quantiles of the bootstrap densities.
+        """
+        if n_bootstraps < 1:
+            raise ValueError("The number of bootstraps must be positive.")
+        if batch_size is None:
+            # The thread count is only known once Julia has started
+            core._init_julia()
+            batch_size = max(core.runtime_info()["threads"], 1)
+
+        grid = self._estimation_grid()
+        implementation = core.resolve_implementation(
+            self.device, implementation or self._implementation
+        )
+        seeds = np.random.SeedSequence(seed).generate_state(
+            n_bootstraps, dtype=np.uint32
+        )
+        estimators = [streaming.StreamingQuantile(q) for q in quantiles]
+
+        count = 0
+        mean = np.zeros(grid.shape)
+        m2 = np.zeros(grid.shape)
+        for start in range(0, n_bootstraps, batch_size):
+            densities = core.bootstrap_densities(
+                self._estimation_data(),
+                grid.grid_jl,
+                estimation,
+                seeds[start : start + batch_size],
+                device=self.device,
+                layout="features",
+                implementation=implementation,
+                **kwargs,
+            )
+            for density in densities:
+                # Welford's update of the mean and the sum of squared deviations
+                count += 1
+                delta = density - mean
+                mean += delta / count
+                m2 += delta * (density - mean)
+                for estimator in estimators:
+                    estimator.update(density)
+
+        std = np.sqrt(m2 / (count - 1)) if count > 1 else np.zeros(grid.shape)
+        quantile_bands = np.array(
+            [estimator.result() for estimator in estimators]
+        ).reshape((len(estimators), *grid.shape))
+
+        return BootstrapResult(mean, std, quantile_bands)
+
+    @property
+    def last_run_stats(self) -> Optional[list]:
+        """
+        Cost of each phase of the last estimate, as a list of `PhaseStats`.
+
+        Only recorded for estimates run within a `parallelkdepy.profile` block, in which
+        case densities fetched afterwards with `get_density` are added as well.
+        Otherwise None.
+        """
+        if self._last_run_stats is None:
+            return None
+
+        return list(self._last_run_stats)
+
+    @contextlib.contextmanager
+    def _run_stats(self, new_run: bool = False):
+        """
+        Add the phases run within the block to `last_run_stats`, if profiling.
+        """
+        if not core.profiling():
+            yield
+            return
+
+        with core.profile() as run:
+            yield
+        if new_run or (self._last_run_stats is None):
+            self._last_run_stats = []
+        self._last_run_stats.extend(run.phases)
+
+    @property
+    def implementation(self) -> Optional[str]:
+        """
+        Default implementation of the estimators, if any.
+        """
+        return self._implementation
+
+    def estimate_density(
+        self, estimation: str, implementation: Optional[str] = None, **kwargs
+    ) -> None:
         """
         Executes the density estimation algorithm on the data.
+
+        The GIL is released while Julia runs the estimation, so other Python threads are
+        not blocked. Within a `parallelkdepy.profile` block, the cost of each phase is
+        recorded in `last_run_stats`.
+
+        Parameters
+        ----------
+        estimation : str
+            Name of the estimator, e.g., 'gradepro' or 'rot'.
+        implementation : Optional[str], optional
+            Implementation to use for this run, e.g., 'serial' or 'threaded', by default
+            None, which uses the default of the object.
+        **kwargs
+            Keyword arguments of the estimator.
         """
-        core.estimate_density(self._densityestimation_jl, estimation, **kwargs)
-        self._density = core.get_density(self._densityestimation_jl)
+        implementation = core.resolve_implementation(
+            self.device, implementation or self._implementation
+        )
+        with self._lock, self._run_stats(new_run=True):
+            core.estimate_density(
+                self._estimation_jl(),
+                estimation,
+                implementation=implementation,
+                **kwargs,
+            )
+            self._invalidate()
+            self._multiresolution = None
+            self._estimation_params = dict(
+                estimation=estimation, implementation=implementation, kwargs=kwargs
+            )
 
-    def get_density(self, **kwargs) -> np.ndarray:
+    def update_data(
+        self,
+        data: np.ndarray | str | os.PathLike,
+    ):
+        """
+        Replaces the data, keeping the grid and, where possible, the Julia estimation.
+
+        Unlike setting `data`, the grid is kept as it is, even if it was found for the
+        previous data. The samples are copied into a buffer owned by the estimation. When
+        the number of samples does not change, they are written over the previous ones in
+        place, and the Julia estimation object is kept if it reads that buffer directly.
+        Otherwise, it is created again on the same grid.
+
+        Parameters
+        ----------
+        data : np.ndarray | str | os.PathLike
+            New data, with the same number of features and layout as before.
+
+        Returns
+        -------
+        DensityEstimation
+            The object itself.
+        """
+        data = core.load_data(data)
+        samples = np.asarray(data)
+        if (samples.ndim > 1) and (self._layout == "samples"):
+            samples = samples.transpose()
+
+        with self._lock:
+            if self._grid is None:
+                self._grid = self._estimation_grid()
+
+            buffer = self._data_buffer
+            in_place = (
+                (self._spool is None)
+                and (buffer is not None)
+                and self._data_copied
+                and buffer.flags.writeable
+                and (buffer.shape == samples.shape)
+            )
+            if in_place:
+                np.copyto(buffer, samples, casting="same_kind")
+            else:
+                dtype = self._dtype or self._grid.dtype()
+                buffer = np.empty(samples.shape, dtype=dtype, order="F")
+                np.copyto(buffer, samples, casting="same_kind")
+
+            estimation_jl = self._densityestimation_jl
+            keep = (
+                in_place
+                and (estimation_jl is not None)
+                and core.holds_buffer(estimation_jl, buffer)
+            )
+
+            self._data = data
+            self._data_buffer = buffer
+            self._data_copied = True
+            self._spool = None
+            self._dirac_cache = None
+            self._found_grids.clear()
+            self._create_estimation()
+            if keep:
+                self._densityestimation_jl = estimation_jl
+
+        return self
+
+    def refit(
+        self,
+        data: np.ndarray | str | os.PathLike,
+        estimation: str,
+        *,
+        implementation: Optional[str] = None,
+        **kwargs,
+    ):
+        """
+        Replaces the data with `update_data` and estimates the density again.
+
+        Returns
+        -------
+        DensityEstimation
+            The object itself.
+        """
+        with self._lock:
+            self.update_data(data)
+            self.estimate_density(estimation, implementation=implementation, **kwargs)
+
+        return self
+
+    def submit(self, estimation: str, **kwargs) -> Future:
+        """
+        Queues the density estimation to run in the background.
+
+        Submissions from all estimation objects are executed one at a time on a single
+        worker thread that drives the Julia runtime.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future that resolves to None once the estimation has finished.
+        """
+        return core.submit(self.estimate_density, estimation, **kwargs)
+
+    async def estimate_density_async(self, estimation: str, **kwargs) -> None:
+        """
+        Awaitable version of `estimate_density` that does not block the event loop.
+        """
+        await asyncio.wrap_future(self.submit(estimation, **kwargs))
+
+    def get_density(
+        self,
+        *,
+        copy: bool = False,
+        out: Optional[np.ndarray | str | os.PathLike] = None,
+        **kwargs,
+    ) -> np.ndarray:
         """
         Returns the estimated density as a Numpy array.
+
+        The density is fetched from Julia once per estimate and set of keyword arguments,
+        and served from a cache until the estimate, the grid or the data change.
+
+        Parameters
+        ----------
+        copy : bool, optional
+            Whether to return an array owned by Python, by default False. Otherwise, a
+            read-only view over the memory of the Julia result is returned.
+        out : Optional[np.ndarray | str | os.PathLike], optional
+            Preallocated array of the grid shape to write the density into, e.g. to reuse
+            it across repeated estimates, or the path of a `.npy` file to create as a
+            memory map, by default None.
+        **kwargs
+            Keyword arguments passed to `get_density` of ParallelKDE.jl.
         """
-        self._density = core.get_density(self._densityestimation_jl, **kwargs)
-        return self._density
+        key = _cache_key(kwargs)
+        # Estimates hold the lock, so a density fetched under it is never stale
+        with self._lock:
+            density = self._density_cache.get(key) if key is not None else None
+            if density is None:
+                with self._run_stats():
+                    density = core.get_density(self._estimation_jl(), **kwargs)
+                if key is not None:
+                    self._density_cache[key] = density
+
+        out = core.open_output(out, density.shape, density.dtype)
+        if (out is None) and not copy:
+            return density
+
+        with self._run_stats():
+            out = core.copy_array(density, out=out)
+        if isinstance(out, np.memmap):
+            out.flush()
+
+        return out
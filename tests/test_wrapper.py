@@ -1,4 +1,9 @@
+import asyncio
 import functools
+import itertools
+import pickle
+import subprocess
+import sys
 
 import numpy as np
 import pytest
@@ -103,3 +108,664 @@ def test_estimation_result(generate_density_estimation, n_dims):
     mise = np.sum(density_estimated - distro) ** 2 * dx / n_gridpoints
 
     assert mise < 5e-5
+
+
+def test_lazy_runtime():
+    code = "import sys, parallelkdepy; assert 'juliacall' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+    pkde.warmup(n_dims=(1,))
+    assert pkde.core.is_initialized()
+
+
+def test_data_layout(generate_data, n_dims):
+    density_estimation = pkde.DensityEstimation(generate_data, grid=True)
+    assert not density_estimation.data_copied
+
+    data_features = np.asfortranarray(generate_data.T)
+    density_estimation_features = pkde.DensityEstimation(
+        data_features, grid=density_estimation.grid, layout="features"
+    )
+    assert not density_estimation_features.data_copied
+
+    # Single precision data is converted to the precision of the grid
+    density_estimation_copy = pkde.DensityEstimation(
+        generate_data.astype(np.float32), grid=density_estimation.grid
+    )
+    assert density_estimation_copy.data_copied
+
+    grid = density_estimation.grid
+    assert np.allclose(
+        pkde.initialize_dirac_sequence(generate_data, grid),
+        pkde.initialize_dirac_sequence(data_features, grid, layout="features"),
+    )
+
+
+def test_found_grid(generate_data, n_dims):
+    density_estimation = pkde.DensityEstimation(
+        generate_data, grid=True, dims=[50] * n_dims
+    )
+    assert isinstance(density_estimation.grid, pkde.Grid)
+    assert tuple(density_estimation.grid.shape) == (50,) * n_dims
+    assert density_estimation.generate_grid(dims=[50] * n_dims) is density_estimation.grid
+
+    density_estimation.estimate_density("rot")
+    assert density_estimation.get_density().shape == (50,) * n_dims
+
+
+@pytest.mark.parametrize("n_dims", [1, 2], indirect=True)
+def test_density_views(generate_density_estimation):
+    generate_density_estimation.estimate_density("gradepro")
+
+    density_view = generate_density_estimation.get_density()
+    assert not density_view.flags.writeable
+
+    density_copy = generate_density_estimation.get_density(copy=True)
+    assert density_copy.flags.writeable
+    assert not np.shares_memory(density_copy, density_view)
+
+    out = np.empty(generate_density_estimation.grid.shape)
+    density_out = generate_density_estimation.get_density(out=out)
+    assert density_out is out
+    assert np.allclose(out, density_view)
+
+
+@pytest.mark.parametrize("n_dims", [1], indirect=True)
+def test_density_cache(generate_density_estimation, generate_data):
+    generate_density_estimation.estimate_density("gradepro")
+
+    density = generate_density_estimation.density
+    assert generate_density_estimation.get_density() is density
+
+    generate_density_estimation.estimate_density("rot")
+    assert generate_density_estimation.get_density() is not density
+
+    density = generate_density_estimation.density
+    generate_density_estimation.data = generate_data[:500]
+    assert generate_density_estimation.get_density() is not density
+
+
+@pytest.mark.parametrize("n_dims", [1, 2], indirect=True)
+def test_evaluate(generate_density_estimation, n_dims):
+    generate_density_estimation.estimate_density("gradepro")
+    density = generate_density_estimation.get_density()
+    grid = generate_density_estimation.grid
+
+    nodes = np.stack([c.ravel() for c in grid.to_meshgrid()], axis=-1)
+    assert np.allclose(generate_density_estimation.evaluate(nodes), density.ravel())
+    assert np.allclose(
+        generate_density_estimation.evaluate(nodes, method="cubic", chunk_size=100),
+        density.ravel(),
+    )
+
+    step = np.asarray(grid.step())
+    lower = np.asarray(grid.lower_bounds())
+    midpoint = lower + step * (np.array([10] * n_dims) + 0.5)
+    corners = [
+        density[tuple(10 + np.array(c))]
+        for c in itertools.product((0, 1), repeat=n_dims)
+    ]
+    assert np.isclose(
+        generate_density_estimation.evaluate(midpoint[np.newaxis, :])[0],
+        np.mean(corners),
+    )
+
+    outside = np.asarray(grid.upper_bounds()) + step
+    assert generate_density_estimation.evaluate(outside[np.newaxis, :])[0] == 0.0
+
+
+@pytest.mark.parametrize("n_dims", [1, 2], indirect=True)
+def test_estimate_many(generate_grid, n_dims, device):
+    datasets = [
+        np.random.normal(scale=0.3, size=(n_samples, n_dims))
+        for n_samples in (200, 300, 400)
+    ]
+    densities = pkde.estimate_many(datasets, generate_grid, "rot", device=device)
+    assert densities.shape == (len(datasets), *generate_grid.shape)
+
+    for data, density in zip(datasets, densities):
+        density_estimation = pkde.DensityEstimation(
+            data, grid=generate_grid, device=device
+        )
+        density_estimation.estimate_density("rot")
+        assert np.allclose(density, density_estimation.get_density())
+
+    densities_found = pkde.estimate_many(datasets, True, "rot", device=device)
+    assert densities_found.shape[0] == len(datasets)
+
+
+@pytest.mark.parametrize("n_dims", [1], indirect=True)
+def test_estimate_density_async(generate_data, generate_grid, device):
+    density_estimation = pkde.DensityEstimation(
+        generate_data, grid=generate_grid, device=device
+    )
+    density_estimation.estimate_density("rot")
+    density_sync = density_estimation.get_density(copy=True)
+
+    futures = [density_estimation.submit("rot") for _ in range(3)]
+    assert all(future.result() is None for future in futures)
+    assert np.allclose(density_estimation.get_density(), density_sync)
+
+    asyncio.run(density_estimation.estimate_density_async("rot"))
+    assert np.allclose(density_estimation.get_density(), density_sync)
+
+    # Densities fetched while an estimate runs are not served after it
+    future = density_estimation.submit("gradepro")
+    density_estimation.get_density()
+    future.result()
+    assert np.array_equal(
+        density_estimation.get_density(),
+        pkde.core.get_density(density_estimation._estimation_jl()),
+    )
+
+
+@pytest.mark.parametrize("n_dims", [1], indirect=True)
+def test_configure(generate_data, monkeypatch):
+    monkeypatch.setitem(pkde.core._config, "implementation", None)
+    monkeypatch.setitem(pkde.core._config, "blas_threads", None)
+
+    info = pkde.configure(blas_threads=1, implementation="serial")
+    assert info["initialized"]
+    assert info["threads"] >= 1
+    assert info["blas_threads"] == 1
+    assert info["implementation"] == "serial"
+
+    with pytest.raises(RuntimeError):
+        pkde.configure(threads=info["threads"] + 1)
+    with pytest.raises(ValueError):
+        pkde.configure(implementation="unknown")
+    with pytest.raises(ValueError):
+        pkde.DensityEstimation(generate_data, grid=True, implementation="cuda")
+
+    density_estimation = pkde.DensityEstimation(
+        generate_data, grid=True, implementation="threaded"
+    )
+    density_estimation.estimate_density("gradepro")
+    density_estimation.estimate_density("gradepro", implementation="serial")
+    assert density_estimation.get_density().shape == density_estimation.grid.shape
+
+
+def test_grid_cache(n_dims, device):
+    pkde.clear_grid_cache()
+    ranges = [(-2.0, 2.0, 50)] * n_dims
+
+    grid1 = pkde.Grid(ranges, device=device)
+    grid2 = pkde.Grid(ranges, device=device)
+    assert grid1.grid_jl is grid2.grid_jl
+    assert grid1 == grid2
+    assert len({grid1, grid2}) == 1
+
+    info = pkde.grid_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+    pkde.clear_grid_cache(maxsize=1)
+    pkde.Grid(ranges, device=device)
+    pkde.Grid([(-3.0, 3.0, 50)] * n_dims, device=device)
+    assert pkde.grid_cache_info().currsize == 1
+    pkde.clear_grid_cache(maxsize=128)
+
+
+def test_grid_equality(n_dims, device):
+    ranges = [(-1.0, 1.0, 100)] * n_dims
+    grid = pkde.Grid(ranges, device=device)
+    grid_uncached = pkde.Grid(
+        grid_jl=pkde.core.create_grid(ranges, device=device, cache=False)
+    )
+    assert grid_uncached.grid_jl is not grid.grid_jl
+    assert grid_uncached == grid
+    assert {grid: 1}[grid_uncached] == 1
+
+    assert grid != pkde.Grid([(-1.0, 1.0, 101)] * n_dims, device=device)
+    assert grid != pkde.Grid([(-1.0, 2.0, 100)] * n_dims, device=device)
+    assert grid != grid.fftgrid()
+    assert grid.fftgrid() == grid.fftgrid()
+
+
+def test_grid_axes(generate_grid, n_dims):
+    range_np = np.linspace(-1.0, 1.0, num=100)
+    axes = generate_grid.axes()
+    assert len(axes) == n_dims
+    for axis in axes:
+        assert np.allclose(axis, range_np)
+
+    mesh = generate_grid.to_meshgrid()
+    mesh_sparse = generate_grid.to_meshgrid(sparse=True)
+    for i in range(n_dims):
+        assert mesh_sparse[i].size == 100
+        assert np.allclose(np.broadcast_to(mesh_sparse[i], mesh[i].shape), mesh[i])
+
+    grid_fft = generate_grid.fftgrid()
+    fft_range = 2 * np.pi * np.fft.fftfreq(100, d=np.diff(range_np)[0])
+    for axis in grid_fft.axes():
+        assert np.allclose(axis, fft_range)
+
+
+def test_partial_fit(generate_data, generate_grid, device):
+    chunks = np.array_split(generate_data, 4)
+    density_estimation = pkde.DensityEstimation.from_chunks(
+        chunks, generate_grid, device=device
+    )
+    assert density_estimation.n_samples == generate_data.shape[0]
+    assert np.allclose(density_estimation.data, generate_data)
+
+    dirac_sequence = pkde.initialize_dirac_sequence(
+        generate_data, generate_grid, device=device
+    )[0]
+    assert np.allclose(density_estimation.dirac_sequence(), dirac_sequence)
+
+    density_estimation.estimate_density("rot")
+    density_full = pkde.DensityEstimation(
+        generate_data, grid=generate_grid, device=device
+    )
+    density_full.estimate_density("rot")
+    assert np.allclose(density_estimation.get_density(), density_full.get_density())
+
+    density_estimation.partial_fit(generate_data[:10])
+    assert density_estimation.n_samples == generate_data.shape[0] + 10
+    dirac_extended = pkde.initialize_dirac_sequence(
+        np.concatenate([generate_data, generate_data[:10]]), generate_grid, device=device
+    )[0]
+    assert np.allclose(density_estimation.dirac_sequence(), dirac_extended)
+
+
+def test_memmap_io(generate_data, generate_grid, device, tmp_path):
+    data_path = tmp_path / "data.npy"
+    np.save(data_path, generate_data)
+
+    density_estimation = pkde.DensityEstimation(
+        str(data_path), grid=generate_grid, device=device
+    )
+    assert isinstance(density_estimation.data, np.memmap)
+    assert not density_estimation.data_copied
+
+    dirac_sequence = pkde.initialize_dirac_sequence(
+        generate_data, generate_grid, device=device
+    )
+    dirac_path = tmp_path / "dirac.npy"
+    dirac_chunked = pkde.initialize_dirac_sequence(
+        data_path, generate_grid, device=device, chunk_size=300, out=dirac_path
+    )
+    assert isinstance(dirac_chunked, np.memmap)
+    assert np.allclose(np.load(dirac_path), dirac_sequence)
+    assert np.allclose(density_estimation.dirac_sequence(chunk_size=300), dirac_sequence[0])
+
+    density_estimation.estimate_density("rot")
+    density_path = tmp_path / "density.npy"
+    density_estimation.get_density(out=density_path)
+    assert np.allclose(np.load(density_path), density_estimation.get_density())
+
+
+@pytest.mark.parametrize("n_dims", [1, 2], indirect=True)
+def test_bootstrap(generate_density_estimation):
+    result = generate_density_estimation.bootstrap(
+        8, "rot", seed=1, quantiles=(0.1, 0.5, 0.9), batch_size=3
+    )
+    shape = generate_density_estimation.grid.shape
+    assert result.mean.shape == shape
+    assert result.std.shape == shape
+    assert result.quantiles.shape == (3, *shape)
+    assert np.all(result.std >= 0)
+    assert np.all(result.quantiles[0] <= result.quantiles[2] + 1e-12)
+
+    result_again = generate_density_estimation.bootstrap(
+        8, "rot", seed=1, quantiles=(0.1, 0.5, 0.9)
+    )
+    assert np.allclose(result.mean, result_again.mean)
+
+    generate_density_estimation.estimate_density("rot")
+    density = generate_density_estimation.get_density()
+    assert np.abs(result.mean - density).max() < 0.1 * density.max()
+
+
+def test_bootstrap_lazy_runtime():
+    # The default batch size is taken from Julia, which is not started yet
+    code = (
+        "import numpy as np, parallelkdepy as pkde; "
+        "data = np.random.normal(size=(100, 1)); "
+        "pkde.DensityEstimation(data).bootstrap(2, 'rot')"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_weights(generate_grid, n_dims, device):
+    data = np.random.uniform(-0.9, 0.9, size=(500, n_dims))
+    counts = np.random.randint(0, 4, size=500)
+    counts[0] = 1
+
+    dirac_sequence = pkde.initialize_dirac_sequence(
+        data, generate_grid, device=device
+    )[0]
+    dirac_ones = pkde.initialize_dirac_sequence(
+        data, generate_grid, device=device, weights=np.ones(500)
+    )[0]
+    assert dirac_ones.dtype == dirac_sequence.dtype
+    assert dirac_ones.shape == dirac_sequence.shape
+    assert np.allclose(dirac_ones, dirac_sequence)
+    with pytest.raises(ValueError):
+        pkde.initialize_dirac_sequence(
+            data, generate_grid, device=device, method="threaded", weights=np.ones(500)
+        )
+
+    # Integer weights are equivalent to repeating the samples
+    dirac_weighted = pkde.initialize_dirac_sequence(
+        data, generate_grid, device=device, weights=counts
+    )[0]
+    dirac_repeated = pkde.initialize_dirac_sequence(
+        np.repeat(data, counts, axis=0), generate_grid, device=device
+    )[0]
+    assert np.allclose(dirac_weighted, dirac_repeated)
+
+    # The estimators take no weights, so estimations do not accept them
+    with pytest.raises(TypeError):
+        pkde.DensityEstimation(data, grid=generate_grid, weights=counts)
+
+    # The cached Dirac sequence follows changes of the data
+    density_estimation = pkde.DensityEstimation(data, grid=generate_grid, device=device)
+    assert np.allclose(density_estimation.dirac_sequence(), dirac_sequence)
+    density_estimation.data = np.repeat(data, counts, axis=0)
+    assert np.allclose(density_estimation.dirac_sequence(), dirac_weighted)
+
+
+def test_save_load(generate_data, generate_grid, device, tmp_path):
+    density_estimation = pkde.DensityEstimation(
+        generate_data, grid=generate_grid, device=device
+    )
+    with pytest.raises(ValueError):
+        density_estimation.save(tmp_path / "empty.npz")
+    density_estimation.estimate_density("rot")
+    density = density_estimation.get_density(copy=True)
+
+    path = tmp_path / "estimation.npz"
+    density_estimation.save(path)
+    loaded = pkde.DensityEstimation.load(path)
+    assert loaded.grid == generate_grid
+    assert loaded.estimation_params["estimation"] == "rot"
+    assert np.array_equal(loaded.density, density)
+
+    points = generate_data[:50]
+    assert np.allclose(loaded.evaluate(points), density_estimation.evaluate(points))
+
+    path32 = tmp_path / "estimation32.npz"
+    density_estimation.save(path32, dtype=np.float32)
+    assert pkde.DensityEstimation.load(path32).density.dtype == np.float32
+
+    code = (
+        "import sys, parallelkdepy as pkde; "
+        f"pkde.DensityEstimation.load({str(path)!r}).evaluate([[0.0] * {points.shape[1]}]); "
+        "assert 'juliacall' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+    unpickled = pickle.loads(pickle.dumps(density_estimation))
+    assert np.array_equal(unpickled.data, generate_data)
+    assert np.array_equal(unpickled.density, density)
+    assert unpickled.grid == generate_grid
+
+    density_float32 = pkde.DensityEstimation(generate_data, dtype=np.float32)
+    assert pickle.loads(pickle.dumps(density_float32)).dtype == np.float32
+
+    density_streamed = pkde.DensityEstimation(
+        None, grid=generate_grid, device=device, layout="features"
+    )
+    density_streamed.partial_fit(generate_data[:60].T)
+    density_streamed.partial_fit(generate_data[60:100].T)
+    unpickled = pickle.loads(pickle.dumps(density_streamed))
+    assert unpickled.n_samples == 100
+    assert np.allclose(unpickled.data, generate_data[:100].T)
+
+
+def test_density_model(generate_data, generate_grid, n_dims, device, tmp_path):
+    density_estimation = pkde.DensityEstimation(
+        generate_data, grid=generate_grid, device=device
+    )
+    density_estimation.estimate_density("rot")
+    model = density_estimation.to_model()
+    assert model.shape == generate_grid.shape
+
+    points = generate_data[:50]
+    assert np.allclose(model.evaluate(points), density_estimation.evaluate(points))
+
+    marginal = model.marginal(0)
+    assert marginal.shape == generate_grid.shape[:1]
+    assert np.isclose(
+        marginal.density.sum() * marginal.step()[0],
+        model.density.sum() * np.prod(model.step()),
+    )
+
+    samples = model.sample(1000, seed=0)
+    assert samples.shape == (1000, n_dims)
+    assert np.array_equal(samples, model.sample(1000, seed=0))
+    for i, (lb, ub) in enumerate(model.bounds()):
+        assert np.all((samples[:, i] >= lb) & (samples[:, i] <= ub))
+
+    path = tmp_path / "estimation.npz"
+    density_estimation.save(path)
+    code = (
+        "import sys, parallelkdepy as pkde; "
+        f"pkde.DensityModel.load({str(path)!r}).sample(10); "
+        "assert 'juliacall' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_distributed(tmp_path):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    from parallelkdepy import distributed
+
+    # Workers start their own Julia runtime, so a single small CPU case is run
+    data = np.random.normal(scale=0.5, size=(500, 2))
+    grid = pkde.Grid([(-2.0, 2.0, 32)] * 2)
+    dirac_sequence = pkde.initialize_dirac_sequence(data, grid)[0]
+
+    data_path = tmp_path / "data.npy"
+    np.save(data_path, data)
+    with ProcessPoolExecutor(
+        max_workers=2, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        dirac_sharded = distributed.dirac_sequence(
+            data, grid, n_shards=2, executor=executor
+        )
+        dirac_mapped = distributed.dirac_sequence(
+            data_path, grid, n_shards=2, executor=executor
+        )
+    assert np.allclose(dirac_sharded, dirac_sequence)
+    assert np.allclose(dirac_mapped, dirac_sequence)
+
+
+def test_profile(generate_data, generate_grid, device):
+    density_estimation = pkde.DensityEstimation(
+        generate_data, grid=generate_grid, device=device
+    )
+    density_estimation.estimate_density("rot")
+    assert density_estimation.last_run_stats is None
+
+    recorded = []
+    with pkde.profile(callback=recorded.append) as run:
+        density_estimation.estimate_density("rot")
+        density = density_estimation.get_density(copy=True)
+    assert recorded == run.phases
+
+    phases = [stats.phase for stats in density_estimation.last_run_stats]
+    assert "estimate_density" in phases
+    assert "get_density" in phases
+    assert all(stats.wall_time >= 0 for stats in run.phases)
+
+    summary = run.summary()
+    assert summary["estimate_density"].bytes_allocated >= 0
+    assert summary["to_numpy"].bytes_copied >= density.nbytes
+
+    # Copies of a cached density are recorded as well
+    with pkde.profile() as run:
+        density_estimation.get_density(out=np.empty_like(density))
+    assert run.summary()["to_numpy"].bytes_copied == density.nbytes
+    assert not pkde.core.profiling()
+
+
+def test_float32(generate_data, n_dims):
+    ranges = [(-5.0, 5.0, 64)] * n_dims
+    grid32 = pkde.Grid(ranges, b32=True)
+    grid64 = pkde.Grid(ranges)
+    assert grid32.dtype() == np.float32
+    assert grid64.dtype() == np.float64
+    assert grid32 != grid64
+
+    dirac32 = pkde.initialize_dirac_sequence(generate_data, grid32)[0]
+    dirac64 = pkde.initialize_dirac_sequence(generate_data, grid64)[0]
+    assert dirac32.real.dtype == np.float32
+    assert np.allclose(dirac32, dirac64, rtol=1e-4, atol=1e-4 * np.abs(dirac64).max())
+
+    density_estimation32 = pkde.DensityEstimation(generate_data, grid=grid32)
+    assert density_estimation32.dtype == np.float32
+    density_estimation32.estimate_density("rot")
+    density32 = density_estimation32.get_density()
+    density_estimation64 = pkde.DensityEstimation(generate_data, grid=grid64)
+    density_estimation64.estimate_density("rot")
+    density64 = density_estimation64.get_density()
+    assert density32.dtype == np.float32
+    assert 2 * density32.nbytes == density64.nbytes
+
+    # Single precision keeps the estimate within 1e-4 of the peak of the 64-bit estimate
+    error = np.abs(density32.astype(np.float64) - density64).max() / density64.max()
+    assert error < 1e-4
+
+    points = np.zeros((1, n_dims))
+    assert np.allclose(
+        density_estimation32.evaluate(points),
+        density_estimation64.evaluate(points),
+        rtol=1e-3,
+    )
+    model32 = density_estimation32.to_model()
+    assert np.allclose(model32.step(), grid64.step())
+    samples = density_estimation32.sample(100, seed=0)
+    assert samples.shape == (100, n_dims)
+    assert np.all(np.abs(samples) <= 5.0)
+    assert density_estimation32.marginal(0).shape == (64,)
+
+    densities32 = pkde.estimate_many([generate_data] * 2, grid32, "rot")
+    assert densities32.dtype == np.float32
+
+    density_found = pkde.DensityEstimation(generate_data, grid=True, dtype=np.float32)
+    assert density_found.grid.dtype() == np.float32
+    with pytest.raises(ValueError):
+        pkde.DensityEstimation(generate_data, grid=grid64, dtype=np.float32)
+
+
+def test_refit(generate_data):
+    density_estimation = pkde.DensityEstimation(generate_data, grid=True)
+    grid = density_estimation.grid
+    density_estimation.estimate_density("rot")
+
+    # The data given by the caller is not owned by the estimation, so it is copied first
+    new_data = np.random.normal(scale=0.5, size=generate_data.shape)
+    density_estimation.update_data(new_data)
+    assert density_estimation.grid is grid
+    assert density_estimation.estimation_params is None
+    buffer = density_estimation._data_buffer
+
+    newer_data = np.random.normal(scale=0.7, size=generate_data.shape)
+    density_estimation.refit(newer_data, "rot")
+    assert density_estimation._data_buffer is buffer
+    assert np.array_equal(density_estimation.data, newer_data)
+    estimation_jl = density_estimation._densityestimation_jl
+    assert estimation_jl is not None
+
+    # Data of the same size is written in place, and the Julia object is kept
+    newest_data = np.random.normal(loc=0.2, scale=0.4, size=generate_data.shape)
+    density_estimation.refit(newest_data, "rot")
+    assert density_estimation._densityestimation_jl is estimation_jl
+    assert density_estimation._data_buffer is buffer
+
+    density_fresh = pkde.DensityEstimation(newest_data, grid=grid)
+    density_fresh.estimate_density("rot")
+    assert np.allclose(density_estimation.get_density(), density_fresh.get_density())
+
+    density_estimation.refit(newer_data[:100], "rot")
+    assert density_estimation.n_samples == 100
+    assert density_estimation.grid is grid
+    assert density_estimation._densityestimation_jl is not estimation_jl
+
+
+def test_multiresolution(n_dims):
+    data = np.random.standard_t(2, size=(2000, n_dims))
+    grid = pkde.Grid([(-20.0, 20.0, 41)] * n_dims)
+    density_estimation = pkde.DensityEstimation(data, grid=grid)
+
+    cached_grids = pkde.grid_cache_info().currsize
+    result = density_estimation.estimate_multiresolution("rot", threshold=0.05, tile=8)
+    assert density_estimation.multiresolution is result
+    assert 0 < len(result.patches) < 5**n_dims
+    assert result.coarse.shape == grid.shape
+    assert pkde.grid_cache_info().currsize == cached_grids
+
+    # Padding is capped at one tile on each side, whatever the tails of the data
+    assert all(n <= 3 * 8 * 4 + 1 for _, patch in result.patches for n in patch.shape)
+
+    bounds, patch = result.patches[0]
+    assert all(
+        (p_lb < lb) and (ub < p_ub) for (lb, ub), (p_lb, p_ub) in zip(bounds, patch.bounds())
+    )
+    assert np.all(np.array(patch.step()) < np.array(grid.step()))
+
+    points = np.zeros((1, n_dims))
+    assert np.allclose(density_estimation.evaluate(points), result.evaluate(points))
+    assert density_estimation.estimation_params["multiresolution"]["tile"] == 8
+
+    density_estimation.estimate_density("rot")
+    assert density_estimation.multiresolution is None
+
+
+def test_marginal_conditional(generate_data, generate_grid, n_dims, device):
+    density_estimation = pkde.DensityEstimation(
+        generate_data, grid=generate_grid, device=device
+    )
+    density_estimation.estimate_density("rot")
+    density = np.array(density_estimation.get_density())
+    steps = generate_grid.step()
+
+    marginal = density_estimation.marginal(0)
+    others = tuple(range(1, n_dims))
+    expected = density.sum(axis=others) * np.prod([steps[d] for d in others])
+    assert np.allclose(marginal, expected)
+    assert density_estimation.marginal(0) is marginal
+    assert np.allclose(marginal, density_estimation.to_model().marginal(0).density)
+
+    if n_dims > 1:
+        assert np.allclose(
+            density_estimation.marginal([1, 0]),
+            density_estimation.to_model().marginal([1, 0]).density,
+        )
+
+        at = generate_grid.axes()[0][50]
+        conditional = density_estimation.conditional(0, at)
+        expected = density[50] / (density[50].sum() * np.prod(steps[1:]))
+        assert np.allclose(conditional, expected)
+        assert np.allclose(
+            density_estimation.conditional(0, 0.013),
+            density_estimation.to_model().conditional(0, 0.013).density,
+        )
+        with pytest.raises(ValueError):
+            density_estimation.conditional(0, 5.0)
+
+
+def test_sample(generate_data, generate_grid, n_dims, device):
+    density_estimation = pkde.DensityEstimation(
+        generate_data, grid=generate_grid, device=device
+    )
+    density_estimation.estimate_density("rot")
+
+    samples = density_estimation.sample(5000, seed=0)
+    assert samples.shape == (5000, n_dims)
+    assert np.array_equal(samples, density_estimation.sample(5000, seed=0))
+    assert np.allclose(samples.mean(axis=0), generate_data.mean(axis=0), atol=0.1)
+    for i, (lb, ub) in enumerate(generate_grid.bounds()):
+        assert np.all((samples[:, i] >= lb) & (samples[:, i] <= ub))
+
+    threaded = density_estimation.sample(5000, seed=0, n_threads=2)
+    assert np.array_equal(threaded, density_estimation.sample(5000, seed=0, n_threads=2))
+
+    out = np.empty((100, n_dims))
+    assert density_estimation.sample(100, out=out) is out
+    with pytest.raises(ValueError):
+        density_estimation.sample(100, out=np.empty((10, n_dims)))